@@ -6,6 +6,16 @@ def register():
     Pool.register(
         currency.Cron,
         currency.Currency,
+        currency.Rate,
+        currency.NBGPayload,
+        currency.ProviderCall,
+        currency.NBGBackfillStart,
+        currency.NBGBackfillResult,
         module='currency_ge',
         type_='model',
     )
+    Pool.register(
+        currency.NBGBackfill,
+        module='currency_ge',
+        type_='wizard',
+    )
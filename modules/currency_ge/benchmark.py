@@ -0,0 +1,117 @@
+"""
+NBG პასუხის პარსერის ბენჩმარკი.
+
+ქმნის სინთეტიკურ მრავალთარიღიან NBG JSON-ს და ადარებს ძველ გზას
+(json.loads + Decimal(str(...)) ყოველ ველზე) parse_nbg-ს, რომელიც
+ნაკადიდან პირდაპირ Decimal-ებად კითხულობს: დრო და მეხსიერების პიკი
+(tracemalloc).
+
+გამოყენება:
+    python -m trytond.modules.currency_ge.benchmark \\
+        --dates 30 365 --currencies 45 --output nbg-benchmark.json
+"""
+import argparse
+import datetime as dt
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from decimal import Decimal, InvalidOperation
+
+from trytond.modules.currency_ge.currency import parse_nbg
+
+
+def create_payload(dates, currencies):
+    """სინთეტიკური NBG პასუხი: dates თარიღი × currencies ვალუტა."""
+    start = dt.date(2025, 1, 1)
+    return [{
+        'date': (start + dt.timedelta(days=d)).isoformat() + 'T00:00:00.000Z',
+        'currencies': [{
+            'code': f'C{c:02d}',
+            'quantity': 1 if c % 3 else 100,
+            'rateFormated': '2.7083',
+            'diffFormated': '0.0012',
+            'rate': round(0.5 + c * 0.137 + d * 0.0001, 4),
+            'name': f"Currency {c}",
+            'diff': 0.0012,
+            'date': (start + dt.timedelta(days=d)).isoformat(),
+            'validFromDate': (start + dt.timedelta(days=d + 1)).isoformat(),
+            } for c in range(currencies)],
+        } for d in range(dates)]
+
+
+def legacy_parse(fp, base_code):
+    """ძველი გზა: მთელი ტექსტი → json.loads → Decimal(str(...))."""
+    data = json.loads(fp.read())
+    result = {}
+    for obj in data:
+        rates = result[obj.get('date')] = {}
+        for item in obj['currencies']:
+            code = item.get('code')
+            if not code:
+                continue
+            try:
+                rate = Decimal(str(item['rate']))
+                quantity = Decimal(str(item.get('quantity', 1)))
+            except (KeyError, ValueError, InvalidOperation):
+                continue
+            if rate <= 0 or quantity <= 0:
+                continue
+            if code == base_code:
+                continue
+            rates[code] = (quantity / rate).quantize(Decimal('0.000000'))
+    return result
+
+
+def measure(func, path, repeat):
+    """საუკეთესო დრო repeat გაშვებიდან და მეხსიერების პიკი."""
+    seconds = []
+    for _ in range(repeat):
+        with open(path, 'rb') as fp:
+            start = time.perf_counter()
+            func(fp, 'GEL')
+            seconds.append(time.perf_counter() - start)
+    with open(path, 'rb') as fp:
+        tracemalloc.start()
+        func(fp, 'GEL')
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {'seconds': round(min(seconds), 4), 'peak_bytes': peak}
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--dates', nargs='+', type=int, default=[30, 365])
+    parser.add_argument('--currencies', type=int, default=45)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default='nbg-benchmark.json')
+    options = parser.parse_args(args)
+
+    results = []
+    for dates in options.dates:
+        with tempfile.NamedTemporaryFile(
+                'w', suffix='.json', delete=False) as fp:
+            json.dump(create_payload(dates, options.currencies), fp)
+        try:
+            result = {
+                'dates': dates,
+                'currencies': options.currencies,
+                'bytes': os.path.getsize(fp.name),
+                'legacy': measure(legacy_parse, fp.name, options.repeat),
+                'parse_nbg': measure(parse_nbg, fp.name, options.repeat),
+                }
+        finally:
+            os.unlink(fp.name)
+        results.append(result)
+        print(json.dumps(result))
+
+    with open(options.output, 'w') as fp:
+        json.dump({
+            'date': dt.datetime.now().isoformat(),
+            'results': results,
+            }, fp, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,55 +1,216 @@
 from decimal import Decimal, DivisionByZero, InvalidOperation
+import codecs
 import datetime as dt
+from collections import defaultdict
+import hashlib
 import json
+import logging
 import ssl
+import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib.request import urlopen, Request
 from urllib.error import URLError, HTTPError
 
+from sql.aggregate import Max
+
+from trytond.config import config
 from trytond.modules.currency.currency import CronFetchError
-from trytond.pool import PoolMeta
+from trytond.cache import Cache
+from trytond.model import ModelSQL, ModelView, Unique, fields
+from trytond.pool import Pool, PoolMeta
 from trytond.pyson import Eval, If
-from trytond.model import fields
+from trytond.tools import grouped_slice, reduce_ids
+from trytond.transaction import Transaction
+from trytond.wizard import Button, StateTransition, StateView, Wizard
 
-__all__ = ['Cron', 'Currency']
+__all__ = [
+    'Cron', 'Currency', 'Rate', 'NBGPayload', 'ProviderCall',
+    'NBGBackfillStart', 'NBGBackfillResult', 'NBGBackfill']
 __metaclass__ = PoolMeta
 
+logger = logging.getLogger(__name__)
+
 # NBG JSON API:
 # Example:
 # https://nbg.gov.ge/gw/api/ct/monetarypolicy/currencies/en/json?date=YYYY-MM-DD
-NBG_URL = (
-    "https://nbg.gov.ge/gw/api/ct/monetarypolicy/currencies/en/json"
-    "?date={date}"
-)
+# trytond.conf-ში შეიძლება გადაიფაროს (მაგ. ლოკალური mock სერვერისთვის):
+#   [currency_ge]
+#   nbg_url = http://localhost:8080/json?date={date}
+NBG_URL = config.get(
+    'currency_ge', 'nbg_url',
+    default=(
+        "https://nbg.gov.ge/gw/api/ct/monetarypolicy/currencies/en/json"
+        "?date={date}"))
 
 REQUEST_TIMEOUT = 10  # seconds
 
+# დღევანდელი თარიღის შენახული პასუხი რამდენ წამს ითვლება ახლად
+NBG_REFRESH = config.getint('currency_ge', 'nbg_refresh', default=3600)
 
-def _fetch_nbg_raw(date):
-    """Fetch raw JSON from NBG for a given date.
+# კურსების წყაროები (providers.py); მხოლოდ nbg – ძველი, ერთი წყაროს გზა
+PROVIDERS = [
+    name.strip() for name in config.get(
+        'currency_ge', 'providers', default='nbg').split(',')
+    if name.strip()]
 
-    Returns a Python object (dict/list) or raises CronFetchError.
-    """
-    if date is None:
-        date = dt.date.today()
-    date_str = date.strftime("%Y-%m-%d")
+# ისტორიის შევსება: პარალელური მოთხოვნები და განმეორება
+NBG_BACKFILL_WORKERS = config.getint(
+    'currency_ge', 'nbg_backfill_workers', default=4)
+NBG_RETRIES = config.getint('currency_ge', 'nbg_retries', default=3)
+NBG_BACKOFF = config.getfloat('currency_ge', 'nbg_backoff', default=1.0)
+
+GEL_PER_UNIT_EXP = Decimal('0.000001')
+
+_MISSING = object()
 
-    url = NBG_URL.format(date=date_str)
-    context = ssl.create_default_context()
-    req = Request(url, headers={"User-Agent": "Tryton currency_ge"})
+
+def _nbg_request(
+        date, etag=None, last_modified=None, url=None, timeout=None):
+    """HTTP request to NBG for a given date.
+
+    Sends If-None-Match / If-Modified-Since when validators are given.
+    url (a template with {date}) and timeout default to NBG_URL and
+    REQUEST_TIMEOUT; they allow mirrors with the same format.
+    Returns (body bytes, headers); body is None when NBG answers
+    304 Not Modified. Raises CronFetchError on network errors.
+    """
+    url = (url or NBG_URL).format(date=date.strftime("%Y-%m-%d"))
+    if timeout is None:
+        timeout = REQUEST_TIMEOUT
+    headers = {"User-Agent": "Tryton currency_ge"}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    req = Request(url, headers=headers)
+    context = ssl.create_default_context() \
+        if url.startswith('https') else None
 
     try:
-        with urlopen(req, context=context, timeout=REQUEST_TIMEOUT) as resp:
-            data = resp.read().decode("utf-8")
-    except (HTTPError, URLError, TimeoutError, OSError) as e:
+        with urlopen(req, context=context, timeout=timeout) as resp:
+            return resp.read(), resp.headers
+    except HTTPError as e:
+        if e.code == 304:
+            return None, e.headers
+        raise CronFetchError() from e
+    except (URLError, TimeoutError, OSError) as e:
         # დროებითი შეცდომა – CronFetchError-ით ვაბრუნებთ
         raise CronFetchError() from e
 
+
+def _nbg_request_retry(date, retries=None, backoff=None):
+    """_nbg_request with retries and exponential backoff.
+
+    Touches only the network, so it is safe to call from worker threads.
+    """
+    if retries is None:
+        retries = NBG_RETRIES
+    if backoff is None:
+        backoff = NBG_BACKOFF
+    for attempt in range(retries + 1):
+        try:
+            return _nbg_request(date)
+        except CronFetchError:
+            if attempt >= retries:
+                raise
+            delay = backoff * (2 ** attempt)
+            logger.info(
+                "NBG request for %s failed, retry in %ss", date, delay)
+            time.sleep(delay)
+
+
+_nbg_decoder = json.JSONDecoder(parse_float=Decimal, parse_int=Decimal)
+
+
+def _decode_nbg(body):
+    """Decode a raw NBG payload into a Python object (dict/list).
+
+    Numbers are decoded straight into Decimal.
+    """
+    if isinstance(body, bytes):
+        body = body.decode('utf-8')
     try:
-        data = json.loads(data)
+        return _nbg_decoder.decode(body)
     except ValueError as e:
         raise CronFetchError() from e
 
-    return data
+
+def _iter_nbg(fp, chunk_size=65536):
+    """Decode an NBG payload from a binary stream, one date at a time.
+
+    The top-level list is read in chunks and every element is yielded as
+    soon as it is complete, so a multi-date payload is never held in
+    memory as a whole. A top-level object is yielded as is.
+
+    Used for offline files (parse_nbg, benchmark). The fetch path keeps
+    the raw body for currency.nbg.payload and decodes it with
+    _decode_nbg instead.
+    """
+    reader = codecs.getincrementaldecoder('utf-8')()
+    buffer, pos, eof = '', 0, False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = fp.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[pos:] + reader.decode(chunk, final=eof)
+        pos = 0
+
+    def skip():
+        # შემდეგი არა-ცარიელი სიმბოლო
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+                pos += 1
+            if pos < len(buffer) or eof:
+                return buffer[pos:pos + 1]
+            fill()
+
+    def decode():
+        nonlocal pos
+        while True:
+            try:
+                obj, pos = _nbg_decoder.raw_decode(buffer, pos)
+                return obj
+            except ValueError as e:
+                if eof:
+                    raise CronFetchError() from e
+                fill()
+
+    char = skip()
+    if char != '[':
+        obj = decode()
+        if skip():
+            raise CronFetchError()
+        yield obj
+        return
+    pos += 1
+    if skip() == ']':
+        pos += 1
+    else:
+        while True:
+            skip()
+            yield decode()
+            char = skip()
+            pos += 1
+            if char == ']':
+                break
+            elif char != ',':
+                raise CronFetchError()
+    if skip():
+        raise CronFetchError()
+
+
+def _fetch_nbg_raw(date):
+    """Fetch raw JSON from NBG for a given date.
+
+    Payloads are kept in currency.nbg.payload, so a date is downloaded
+    only once it is settled (see NBGPayload.get_payload).
+
+    Returns a Python object (dict/list) or raises CronFetchError.
+    """
+    NBGPayload = Pool().get('currency.nbg.payload')
+    return NBGPayload.get_payload(date)
 
 
 def _parse_nbg_rates(base_code, date):
@@ -70,46 +231,118 @@ def _parse_nbg_rates(base_code, date):
     აქ ვთვლით:
         value = quantity / rate = რამდენი FX მოდის 1 GEL-ზე.
     """
-    data = _fetch_nbg_raw(date)
+    return _nbg_rates(_fetch_nbg_raw(date), base_code)
 
-    # Data structure: [ { "currencies": [ ... ] } ] or { "currencies": [ ... ] }
-    if isinstance(data, list):
-        if not data:
-            raise CronFetchError()
-        obj = data[0]
-    else:
-        obj = data
 
-    currencies = obj.get("currencies")
-    if not isinstance(currencies, list):
+def _nbg_rates(data, base_code):
+    """Parse a decoded NBG payload (see _parse_nbg_rates).
+
+    Only the first date of the payload is used; rejected entries are
+    logged.
+    """
+    blocks = _nbg_blocks(data)
+    if not blocks:
         raise CronFetchError()
+    rates, rejected = _nbg_block_rates(blocks[0][1], base_code)
+    for code, reason in rejected:
+        logger.warning("NBG entry %s rejected: %s", code, reason)
+    return rates
 
-    result = {}
 
-    for item in currencies:
+def parse_nbg(data, base_code):
+    """Parse a (possibly multi-date) NBG payload.
+
+    data: bytes/str, a binary stream (e.g. an open export file) or an
+    already decoded object.
+
+    Returns (rates, rejected):
+        rates    = { date: { 'USD': Decimal(foreign_per_1_GEL), ... } }
+        rejected = [ (date, code or '#index', reason), ... ]
+    """
+    if hasattr(data, 'read'):
+        objs = _iter_nbg(data)
+    else:
+        if isinstance(data, (bytes, str)):
+            data = _decode_nbg(data)
+        objs = data if isinstance(data, list) else [data]
+    rates, rejected = {}, []
+    for obj in objs:
+        for date, currencies in _nbg_blocks(obj):
+            rates[date], block_rejected = _nbg_block_rates(
+                currencies, base_code)
+            rejected.extend((date, c, r) for c, r in block_rejected)
+    return rates, rejected
+
+
+def _nbg_blocks(data):
+    """Validate the payload shape once.
+
+    Data structure: [ { "date": ..., "currencies": [ ... ] }, ... ]
+    or { "currencies": [ ... ] }. Returns [(date or None, currencies)].
+    """
+    if isinstance(data, dict):
+        data = [data]
+    if not isinstance(data, list):
+        raise CronFetchError()
+    blocks = []
+    for obj in data:
+        if not isinstance(obj, dict):
+            raise CronFetchError()
+        currencies = obj.get("currencies")
+        if not isinstance(currencies, list):
+            raise CronFetchError()
+        date = obj.get("date")
+        if isinstance(date, str):
+            try:
+                date = dt.date.fromisoformat(date[:10])
+            except ValueError:
+                raise CronFetchError()
+        else:
+            date = None
+        blocks.append((date, currencies))
+    return blocks
+
+
+_VALUE_EXP = Decimal('0.000000')
+
+
+def _nbg_block_rates(currencies, base_code):
+    """Return ({code: value}, [(code or '#index', reason)])."""
+    result = {}
+    rejected = []
+    for index, item in enumerate(currencies):
+        if not isinstance(item, dict):
+            rejected.append((f'#{index}', "not an object"))
+            continue
         code = item.get("code")
         if not code:
+            rejected.append((f'#{index}', "missing code"))
             continue
 
+        # json-ი Decimal-ად იკითხება (parse_float/parse_int), str()-ის
+        # გარეშე; ძველი float/str მნიშვნელობებიც მიიღება
+        rate = item.get("rate")                       # GEL amount
+        quantity = item.get("quantity", 1)            # FX units
         try:
-            rate = Decimal(str(item["rate"]))                 # GEL amount
-            quantity = Decimal(str(item.get("quantity", 1)))  # FX units
-        except (KeyError, ValueError, InvalidOperation):
+            if not isinstance(rate, Decimal):
+                rate = Decimal(str(rate))
+            if not isinstance(quantity, Decimal):
+                quantity = Decimal(str(quantity))
+        except (ValueError, InvalidOperation):
+            rejected.append((code, "invalid rate or quantity"))
             continue
-
-        if rate <= 0 or quantity <= 0:
+        if not rate.is_finite() or not quantity.is_finite() \
+                or rate <= 0 or quantity <= 0:
+            rejected.append((code, "rate and quantity must be positive"))
             continue
 
-        # 1 GEL = value units of foreign currency (GEL → FX)
-        value = (quantity / rate).quantize(Decimal('0.000000'))
-
         # Skip base currency itself
         if code == base_code:
             continue
 
-        result[code] = value
-
-    return result
+        # 1 GEL = value units of foreign currency (GEL → FX)
+        result[code] = (quantity / rate).quantize(_VALUE_EXP)
+    return result, rejected
 
 
 class Cron(metaclass=PoolMeta):
@@ -139,7 +372,45 @@ class Cron(metaclass=PoolMeta):
         if self.currency.code != "GEL":
             raise CronFetchError("NBG source requires GEL as base currency")
 
-        return _parse_nbg_rates(self.currency.code, date)
+        if PROVIDERS == ['nbg']:
+            return _parse_nbg_rates(self.currency.code, date)
+        return self._fetch_providers(date)
+
+    def _fetch_providers(self, date):
+        """
+        NBG და დამატებითი წყაროები ერთდროულად (იხ. providers.py).
+
+        დასრულებული თარიღის შენახული NBG პასუხი ქსელს აღარ საჭიროებს;
+        ყოველი გამოძახების დაყოვნება ინახება currency.rate.provider.call-ში.
+        """
+        from .providers import (
+            NBGProvider, combine_rates, get_providers, query_providers)
+
+        pool = Pool()
+        NBGPayload = pool.get('currency.nbg.payload')
+        ProviderCall = pool.get('currency.rate.provider.call')
+
+        record, fresh = NBGPayload.get_stored(date)
+        if fresh:
+            return _nbg_rates(_decode_nbg(record.payload), self.currency.code)
+
+        providers = get_providers(nbg=NBGProvider(
+                etag=record.etag if record else None,
+                last_modified=record.last_modified if record else None,
+                payload=record.payload if record else None))
+        results = query_providers(date, self.currency.code, providers)
+        # ჩანაწერები ინახება წარუმატებელი გამოძახებისასაც
+        ProviderCall.create([{
+                    'provider': r.provider,
+                    'date': date,
+                    'latency': round(r.latency, 3),
+                    'state': r.state,
+                    'error': r.error,
+                    } for r in results])
+        for result in results:
+            if result.provider == 'nbg' and result.state == 'done':
+                NBGPayload.store(date, result.body, result.headers, record)
+        return combine_rates(results)
 
 
 class Currency(metaclass=PoolMeta):
@@ -151,6 +422,9 @@ class Currency(metaclass=PoolMeta):
         'get_gel_per_unit'
     )
 
+    # (currency, date) → GEL per 1 unit; LRU, ზომა: [cache] ...gel_rate
+    _gel_rate_cache = Cache('currency.currency.gel_rate', context=False)
+
     @classmethod
     def get_gel_per_unit(cls, currencies, name):
         """Convert Tryton's rate (foreign per 1 GEL)
@@ -158,22 +432,420 @@ class Currency(metaclass=PoolMeta):
 
         თუ current_rate = 0.369208 (1 GEL = 0.369208 USD),
         აქ მივიღებთ: 1 / 0.369208 ≈ 2.7083 GEL per 1 USD.
+
+        ყველა ვალუტის კურსი ერთი SQL მოთხოვნით მოდის
+        (კონტექსტის 'date'-ისთვის), და არა თითო ვალუტაზე ცალკე.
         """
+        rates = cls._get_rates_at([c.id for c in currencies])
         res = {}
         for cur in currencies:
-            # ვცადოთ ჯერ 'rate', მერე 'current_rate'
-            rate = getattr(cur, 'rate', None)
-            if rate is None:
-                rate = getattr(cur, 'current_rate', None)
-
+            rate = rates.get(cur.id)
             try:
                 if rate:
-                    value = (Decimal('1') / rate).quantize(
-                        Decimal('0.000001')
-                    )
+                    value = (Decimal('1') / rate).quantize(GEL_PER_UNIT_EXP)
                     res[cur.id] = value
                 else:
                     res[cur.id] = None
             except (DivisionByZero, InvalidOperation):
                 res[cur.id] = None
         return res
+
+    @classmethod
+    def gel_rates(cls, keys):
+        """Return {(currency id, date): GEL per 1 unit} for the keys.
+
+        მნიშვნელობა იგივეა, რაც gel_per_unit ველის (6 ნიშანი), ან None,
+        თუ კურსი არ არის. GEL-ისთვის ყოველთვის 1.
+        """
+        result = {}
+        missing = defaultdict(list)
+        for currency_id, date in set(keys):
+            value = cls._gel_rate_cache.get((currency_id, date), _MISSING)
+            if value is _MISSING:
+                missing[date].append(currency_id)
+            else:
+                result[currency_id, date] = value
+        gel_ids = set()
+        if missing:
+            gel_ids = {c.id for c in cls.search([('code', '=', 'GEL')])}
+        for date, currency_ids in missing.items():
+            rates = cls._get_rates_at(currency_ids, date)
+            for currency_id in currency_ids:
+                rate = rates.get(currency_id)
+                if currency_id in gel_ids:
+                    value = Decimal(1)
+                elif rate:
+                    value = (Decimal(1) / rate).quantize(GEL_PER_UNIT_EXP)
+                else:
+                    value = None
+                cls._gel_rate_cache.set((currency_id, date), value)
+                result[currency_id, date] = value
+        return result
+
+    @classmethod
+    def _gel_keys(cls, values):
+        Date = Pool().get('ir.date')
+        today = Date.today()
+        return [
+            (int(currency), date or today) for _, currency, date in values]
+
+    @classmethod
+    def to_gel(cls, values):
+        """Convert [(amount, currency, date), ...] into GEL amounts.
+
+        თანხა × gel_per_unit, დამრგვალებული ლარის მიხედვით. ბრუნდება
+        იმავე რიგის სია; None, თუ თანხა ან კურსი არ არის.
+        """
+        gel = cls._gel_currency()
+        keys = cls._gel_keys(values)
+        rates = cls.gel_rates(keys)
+        result = []
+        for (amount, _, _), key in zip(values, keys):
+            rate = rates[key]
+            if amount is None or rate is None:
+                result.append(None)
+            else:
+                amount = amount * rate
+                result.append(gel.round(amount) if gel else amount)
+        return result
+
+    @classmethod
+    def from_gel(cls, values):
+        """Convert [(GEL amount, currency, date), ...] into the currencies.
+
+        თანხა / gel_per_unit, დამრგვალებული სამიზნე ვალუტის მიხედვით.
+        """
+        keys = cls._gel_keys(values)
+        rates = cls.gel_rates(keys)
+        currencies = {c.id: c for c in cls.browse({k[0] for k in keys})}
+        result = []
+        for (amount, _, _), key in zip(values, keys):
+            rate = rates[key]
+            if amount is None or not rate:
+                result.append(None)
+            else:
+                result.append(currencies[key[0]].round(amount / rate))
+        return result
+
+    @classmethod
+    def _gel_currency(cls):
+        currencies = cls.search([('code', '=', 'GEL')], limit=1)
+        return currencies[0] if currencies else None
+
+    @classmethod
+    def _get_rates_at(cls, currency_ids, date=None):
+        """Return {currency id: rate} of the latest rate on or before date.
+
+        Same lookup as Currency.get_rate, but one query per
+        grouped_slice instead of one search per currency.
+        """
+        pool = Pool()
+        Date = pool.get('ir.date')
+        Rate = pool.get('currency.currency.rate')
+        if date is None:
+            date = Transaction().context.get('date') or Date.today()
+
+        rate = Rate.__table__()
+        last = Rate.__table__()
+        cursor = Transaction().connection.cursor()
+        result = {}
+        for sub_ids in grouped_slice(currency_ids):
+            latest = last.select(
+                last.currency, Max(last.date).as_('date'),
+                where=reduce_ids(last.currency, sub_ids)
+                & (last.date <= date),
+                group_by=last.currency)
+            cursor.execute(*rate.join(latest,
+                    condition=(rate.currency == latest.currency)
+                    & (rate.date == latest.date)
+                    ).select(rate.currency, rate.rate))
+            for currency_id, value in cursor:
+                # SQLite-ზე Numeric შეიძლება float-ად მოვიდეს
+                if value is not None and not isinstance(value, Decimal):
+                    value = Decimal(str(value))
+                result[currency_id] = value
+        return result
+
+
+class Rate(metaclass=PoolMeta):
+    __name__ = 'currency.currency.rate'
+
+    @classmethod
+    def create(cls, vlist):
+        rates = super().create(vlist)
+        Pool().get('currency.currency')._gel_rate_cache.clear()
+        return rates
+
+    @classmethod
+    def write(cls, *args):
+        super().write(*args)
+        Pool().get('currency.currency')._gel_rate_cache.clear()
+
+    @classmethod
+    def delete(cls, rates):
+        super().delete(rates)
+        Pool().get('currency.currency')._gel_rate_cache.clear()
+
+
+class NBGPayload(ModelSQL, ModelView):
+    "NBG Rate Payload"
+    __name__ = 'currency.nbg.payload'
+
+    date = fields.Date("Date", required=True, readonly=True)
+    payload = fields.Text("Payload", readonly=True)
+    hash = fields.Char("Hash", readonly=True, help="SHA-256 of the payload.")
+    etag = fields.Char("ETag", readonly=True)
+    last_modified = fields.Char("Last Modified", readonly=True)
+    fetched_at = fields.Timestamp("Fetched At", readonly=True)
+
+    @classmethod
+    def __setup__(cls):
+        super().__setup__()
+        t = cls.__table__()
+        cls._sql_constraints += [
+            ('date_uniq', Unique(t, t.date),
+             'currency_ge.msg_nbg_payload_date_unique'),
+        ]
+        cls._order.insert(0, ('date', 'DESC'))
+
+    @classmethod
+    def get_stored(cls, date):
+        """Return (record or None, fresh).
+
+        fresh: the stored payload can be used without a request —
+        დასრულებული (წარსული) თარიღი, ან დღევანდელი NBG_REFRESH წამის
+        განმავლობაში.
+        """
+        Date = Pool().get('ir.date')
+        today = Date.today()
+        records = cls.search([('date', '=', date)], limit=1)
+        record = records[0] if records else None
+        if record and record.payload:
+            age = (dt.datetime.now() - record.fetched_at).total_seconds() \
+                if record.fetched_at else NBG_REFRESH
+            if date < today or age < NBG_REFRESH:
+                return record, True
+        return record, False
+
+    @classmethod
+    def store(cls, date, body, headers, record=None):
+        """Store a downloaded payload; body None means 304 Not Modified."""
+        now = dt.datetime.now()
+        if body is None:
+            if record:
+                cls.write([record], {'fetched_at': now})
+            return
+        values = {
+            'payload': body.decode('utf-8'),
+            'hash': hashlib.sha256(body).hexdigest(),
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'fetched_at': now,
+        }
+        if record:
+            cls.write([record], values)
+        else:
+            cls.create([dict(values, date=date)])
+
+    @classmethod
+    def get_payload(cls, date):
+        """Return the decoded NBG payload for the date.
+
+        - დასრულებული (წარსული) თარიღი: მხოლოდ შენახულიდან, ქსელი აღარ.
+        - დღევანდელი: შენახულიდან NBG_REFRESH წამის განმავლობაში, შემდეგ
+          პირობითი მოთხოვნით (ETag / Last-Modified).
+        """
+        Date = Pool().get('ir.date')
+        if date is None:
+            date = Date.today()
+
+        record, fresh = cls.get_stored(date)
+        if fresh:
+            return _decode_nbg(record.payload)
+
+        body, headers = _nbg_request(
+            date,
+            etag=record.etag if record else None,
+            last_modified=record.last_modified if record else None)
+        if body is None and not (record and record.payload):
+            raise CronFetchError()
+        cls.store(date, body, headers, record)
+        return _decode_nbg(body if body is not None else record.payload)
+
+
+class ProviderCall(ModelSQL, ModelView):
+    "Rate Provider Call"
+    __name__ = 'currency.rate.provider.call'
+
+    provider = fields.Char("Provider", required=True, readonly=True)
+    date = fields.Date("Date", readonly=True)
+    latency = fields.Float("Latency", digits=(16, 3), readonly=True,
+        help="In seconds.")
+    state = fields.Selection([
+            ('done', "Done"),
+            ('failed', "Failed"),
+            ('timeout', "Timeout"),
+            ('cancelled', "Cancelled"),
+            ], "State", readonly=True)
+    error = fields.Char("Error", readonly=True)
+
+    @classmethod
+    def __setup__(cls):
+        super().__setup__()
+        cls._order.insert(0, ('create_date', 'DESC'))
+
+
+class NBGBackfillStart(ModelView):
+    "NBG Rate Backfill"
+    __name__ = 'currency.nbg.backfill.start'
+
+    currency = fields.Many2One(
+        'currency.currency', "Base Currency", required=True,
+        domain=[('code', '=', 'GEL')])
+    currencies = fields.Many2Many(
+        'currency.currency', None, None, "Currencies",
+        domain=[('code', '!=', 'GEL')],
+        help="Leave empty to fill all currencies.")
+    start_date = fields.Date(
+        "Start Date", required=True,
+        domain=[
+            If(Eval('end_date'),
+                ('start_date', '<=', Eval('end_date')),
+                ()),
+            ])
+    end_date = fields.Date("End Date", required=True)
+
+    @staticmethod
+    def default_currency():
+        Currency = Pool().get('currency.currency')
+        currencies = Currency.search([('code', '=', 'GEL')], limit=1)
+        if currencies:
+            return currencies[0].id
+
+
+class NBGBackfillResult(ModelView):
+    "NBG Rate Backfill"
+    __name__ = 'currency.nbg.backfill.result'
+
+    fetched = fields.Integer("Fetched Dates", readonly=True)
+    stored = fields.Integer("Stored Dates", readonly=True)
+    rates = fields.Integer("Created Rates", readonly=True)
+    report = fields.Text("Report", readonly=True)
+
+
+class NBGBackfill(Wizard):
+    "NBG Rate Backfill"
+    __name__ = 'currency.nbg.backfill'
+
+    start = StateView(
+        'currency.nbg.backfill.start',
+        'currency_ge.nbg_backfill_start_view_form', [
+            Button("Cancel", 'end', 'tryton-cancel'),
+            Button("Backfill", 'backfill', 'tryton-ok', default=True),
+            ])
+    backfill = StateTransition()
+    result = StateView(
+        'currency.nbg.backfill.result',
+        'currency_ge.nbg_backfill_result_view_form', [
+            Button("Close", 'end', 'tryton-close', default=True),
+            ])
+
+    def transition_backfill(self):
+        """
+        - უკვე შენახული თარიღები ქსელიდან აღარ მოდის;
+        - დანარჩენი პარალელურად (NBG_BACKFILL_WORKERS), განმეორებით;
+        - ყველა payload და კურსი – თითო create-ით.
+        """
+        pool = Pool()
+        Date = pool.get('ir.date')
+        Currency = pool.get('currency.currency')
+        Rate = pool.get('currency.currency.rate')
+        NBGPayload = pool.get('currency.nbg.payload')
+
+        start = self.start
+        end_date = min(start.end_date, Date.today())
+        dates = []
+        date = start.start_date
+        while date <= end_date:
+            dates.append(date)
+            date += dt.timedelta(days=1)
+
+        payloads = {
+            p.date: p for p in NBGPayload.search([
+                    ('date', '>=', start.start_date),
+                    ('date', '<=', end_date),
+                    ])
+            if p.payload}
+        missing = [d for d in dates if d not in payloads]
+
+        errors = []
+        to_store = []
+        data = {d: _decode_nbg(p.payload) for d, p in payloads.items()}
+        if missing:
+            workers = max(1, min(NBG_BACKFILL_WORKERS, len(missing)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    d: executor.submit(_nbg_request_retry, d)
+                    for d in missing}
+            now = dt.datetime.now()
+            for date, future in futures.items():
+                try:
+                    body, headers = future.result()
+                    data[date] = _decode_nbg(body)
+                except CronFetchError:
+                    errors.append(date)
+                    continue
+                to_store.append({
+                        'date': date,
+                        'payload': body.decode('utf-8'),
+                        'hash': hashlib.sha256(body).hexdigest(),
+                        'etag': headers.get('ETag'),
+                        'last_modified': headers.get('Last-Modified'),
+                        'fetched_at': now,
+                        })
+        if to_store:
+            NBGPayload.create(to_store)
+
+        currencies = list(start.currencies) or Currency.search([
+                ('code', '!=', start.currency.code),
+                ])
+        by_code = {c.code: c for c in currencies}
+        existing = {
+            (r.currency.id, r.date) for r in Rate.search([
+                    ('currency', 'in', [c.id for c in currencies]),
+                    ('date', '>=', start.start_date),
+                    ('date', '<=', end_date),
+                    ])}
+        to_create = []
+        for date in sorted(data):
+            try:
+                rates = _nbg_rates(data[date], start.currency.code)
+            except CronFetchError:
+                errors.append(date)
+                continue
+            for code, value in rates.items():
+                currency = by_code.get(code)
+                if not currency or (currency.id, date) in existing:
+                    continue
+                to_create.append({
+                        'currency': currency.id,
+                        'date': date,
+                        'rate': value,
+                        })
+        if to_create:
+            Rate.create(to_create)
+
+        self.result.fetched = len(to_store)
+        self.result.stored = len(payloads)
+        self.result.rates = len(to_create)
+        self.result.report = '\n'.join(
+            f"{d}: NBG request failed" for d in sorted(set(errors)))
+        return 'result'
+
+    def default_result(self, fields):
+        return {
+            'fetched': self.result.fetched,
+            'stored': self.result.stored,
+            'rates': self.result.rates,
+            'report': self.result.report,
+            }
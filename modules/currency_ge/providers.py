@@ -0,0 +1,216 @@
+"""
+კურსების წყაროები (providers).
+
+NBG და დამატებითი წყაროები ერთდროულად იკითხება asyncio-თ, თითოეული
+საკუთარი timeout-ით. ბრუნდება პირველი სწორი პასუხი, ან quorum > 1-ის
+დროს – quorum რაოდენობის პასუხის მედიანა ყოველ ვალუტაზე. ნელი წყარო
+ამიტომ cron-ს აღარ აჩერებს.
+
+    [currency_ge]
+    providers = nbg, mirror
+    provider_timeout = 5
+    provider_quorum = 1
+    # NBG-ის ფორმატის დამატებითი წყარო
+    mirror_url = http://localhost:8080/json?date={date}
+    mirror_timeout = 2
+
+urllib ბლოკირებადია, ამიტომ მოთხოვნები საკუთარ thread pool-ში
+სრულდება; ვადაგასული მოთხოვნა აღარ ელოდება.
+"""
+import abc
+import asyncio
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from statistics import median
+from urllib.error import URLError
+
+from trytond.config import config
+from trytond.modules.currency.currency import CronFetchError
+
+from .currency import (
+    _VALUE_EXP, PROVIDERS, REQUEST_TIMEOUT, _decode_nbg, _nbg_rates,
+    _nbg_request)
+
+PROVIDER_TIMEOUT = config.getfloat(
+    'currency_ge', 'provider_timeout', default=REQUEST_TIMEOUT)
+PROVIDER_QUORUM = config.getint('currency_ge', 'provider_quorum', default=1)
+
+# state: 'done', 'failed', 'timeout' ან 'cancelled' (quorum უკვე შედგა)
+ProviderResult = namedtuple('ProviderResult', [
+        'provider', 'state', 'rates', 'body', 'headers', 'latency', 'error'])
+
+_providers = {}
+
+
+def register_provider(cls):
+    "Register a Provider class under its name"
+    _providers[cls.name] = cls
+    return cls
+
+
+class Provider(abc.ABC):
+    "Rate provider; request is blocking and runs in a worker thread"
+    name = None
+
+    def __init__(self, name=None, timeout=None):
+        if name:
+            self.name = name
+        if timeout is None:
+            timeout = config.getfloat(
+                'currency_ge', f'{self.name}_timeout',
+                default=PROVIDER_TIMEOUT)
+        self.timeout = timeout
+
+    @abc.abstractmethod
+    def request(self, date):
+        "Return (body, headers) or raise CronFetchError"
+
+    def parse(self, body, base_code):
+        "Return {code: foreign per 1 base} or raise CronFetchError"
+        return _nbg_rates(_decode_nbg(body), base_code)
+
+
+@register_provider
+class NBGProvider(Provider):
+    "National Bank of Georgia; conditional request with stored validators"
+    name = 'nbg'
+
+    def __init__(self, etag=None, last_modified=None, payload=None, **kw):
+        super().__init__(**kw)
+        self.etag = etag
+        self.last_modified = last_modified
+        self.payload = payload
+
+    def request(self, date):
+        if not self.payload:
+            return _nbg_request(date, timeout=self.timeout)
+        return _nbg_request(
+            date, etag=self.etag, last_modified=self.last_modified,
+            timeout=self.timeout)
+
+    def parse(self, body, base_code):
+        if body is None:
+            # 304 Not Modified – შენახული პასუხი
+            if not self.payload:
+                raise CronFetchError()
+            body = self.payload
+        return super().parse(body, base_code)
+
+
+class URLProvider(Provider):
+    "Provider with the NBG payload format at <name>_url"
+
+    def __init__(self, name, url, **kw):
+        super().__init__(name=name, **kw)
+        self.url = url
+
+    def request(self, date):
+        return _nbg_request(date, url=self.url, timeout=self.timeout)
+
+
+def get_providers(names=None, **instances):
+    """Return the configured providers.
+
+    instances: already built providers by name (e.g. nbg=NBGProvider(...)).
+    """
+    if names is None:
+        names = PROVIDERS
+    providers = []
+    for name in names:
+        if name in instances:
+            providers.append(instances[name])
+        elif name in _providers:
+            providers.append(_providers[name]())
+        else:
+            url = config.get('currency_ge', f'{name}_url')
+            if not url:
+                raise CronFetchError(f"Unknown rate provider {name}")
+            providers.append(URLProvider(name, url))
+    return providers
+
+
+async def _query(loop, executor, provider, date, base_code):
+    start = time.perf_counter()
+    body = headers = rates = error = None
+    try:
+        body, headers = await asyncio.wait_for(
+            loop.run_in_executor(
+                executor, partial(provider.request, date)),
+            provider.timeout)
+        rates = provider.parse(body, base_code)
+        state = 'done' if rates else 'failed'
+    except asyncio.TimeoutError:
+        state = 'timeout'
+    except asyncio.CancelledError:
+        state = 'cancelled'
+    except CronFetchError as e:
+        cause = e.__cause__
+        if isinstance(cause, URLError):
+            cause = cause.reason
+        # socket-ის timeout (იგივე ზღვარი) ხშირად wait_for-ზე ადრე ჩნდება
+        state = 'timeout' if isinstance(cause, TimeoutError) else 'failed'
+        error = str(e.__cause__ or e) or None
+    return ProviderResult(
+        provider.name, state, rates, body, headers,
+        time.perf_counter() - start, error)
+
+
+async def _gather(providers, date, base_code, quorum):
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=len(providers))
+    tasks = [
+        asyncio.ensure_future(
+            _query(loop, executor, p, date, base_code))
+        for p in providers]
+    try:
+        done = 0
+        for future in asyncio.as_completed(tasks):
+            result = await future
+            done += result.state == 'done'
+            if done >= quorum:
+                break
+        for task in tasks:
+            task.cancel()
+        return await asyncio.gather(*tasks)
+    finally:
+        # ვადაგასულ thread-ებს არ ველოდებით
+        executor.shutdown(wait=False)
+
+
+def _quorum(providers, quorum):
+    if quorum is None:
+        quorum = PROVIDER_QUORUM
+    return max(1, min(quorum, len(providers)))
+
+
+def query_providers(date, base_code, providers=None, quorum=None):
+    """Query providers concurrently; returns a ProviderResult per provider
+    (latency in seconds), failed ones included."""
+    if providers is None:
+        providers = get_providers()
+    return asyncio.run(
+        _gather(providers, date, base_code, _quorum(providers, quorum)))
+
+
+def combine_rates(results, quorum=None):
+    """Rates from the first valid result, or the median per currency of
+    the first quorum valid results.
+
+    Raises CronFetchError when fewer than quorum results are valid.
+    """
+    quorum = _quorum(results, quorum)
+    valid = sorted(
+        (r for r in results if r.state == 'done'), key=lambda r: r.latency)
+    if len(valid) < quorum:
+        raise CronFetchError()
+    if quorum == 1:
+        return valid[0].rates
+
+    valid = valid[:quorum]
+    codes = set.intersection(*(set(r.rates) for r in valid))
+    return {
+        code: median(r.rates[code] for r in valid).quantize(_VALUE_EXP)
+        for code in codes}
+
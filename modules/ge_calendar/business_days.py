@@ -0,0 +1,28 @@
+import datetime as dt
+
+
+def build_index(year, holidays=()):
+    """
+    სამუშაო დღეების კუმულაციური ინდექსი ერთი წლისთვის.
+
+    index[i] = სამუშაო დღეების (ორშაბათი-პარასკევი, დღესასწაულების
+    გარეშე) რაოდენობა წლის პირველ i დღეში. ამიტომ ორ თარიღს შორის
+    დათვლა ერთი გამოკლებაა.
+    """
+    holidays = set(holidays)
+    day = dt.date(year, 1, 1)
+    one_day = dt.timedelta(days=1)
+    index = [0]
+    while day.year == year:
+        # 0=ორშაბათი ... 4=პარასკევი
+        is_business = day.weekday() < 5 and day not in holidays
+        index.append(index[-1] + is_business)
+        day += one_day
+    return tuple(index)
+
+
+def count_from_index(index, start_date, end_date):
+    """ერთი წლის ინდექსით დათვლა [start_date, end_date] შუალედში."""
+    start = start_date.timetuple().tm_yday - 1
+    end = end_date.timetuple().tm_yday
+    return index[end] - index[start]
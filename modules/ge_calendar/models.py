@@ -1,4 +1,13 @@
+import datetime as dt
+
+from sql.aggregate import Count, Max
+
+from trytond.cache import Cache
 from trytond.model import ModelSQL, ModelView, fields
+from trytond.transaction import Transaction
+
+from .business_days import build_index, count_from_index
+from .profiling import profiled
 
 
 class PublicHoliday(ModelSQL, ModelView):
@@ -16,6 +25,93 @@ class PublicHoliday(ModelSQL, ModelView):
          'A public holiday already exists for this date and country.'),
     ]
 
+    _business_days_cache = Cache(
+        'ge.public_holiday.business_days', context=False)
+
     @staticmethod
     def default_active():
         return True
+
+    @classmethod
+    def create(cls, vlist):
+        records = super().create(vlist)
+        cls._business_days_cache.clear()
+        return records
+
+    @classmethod
+    def write(cls, *args):
+        super().write(*args)
+        cls._business_days_cache.clear()
+
+    @classmethod
+    def delete(cls, records):
+        super().delete(records)
+        cls._business_days_cache.clear()
+
+    @classmethod
+    def holiday_version(cls):
+        """
+        დღესასწაულების ნაკრების ვერსია.
+
+        იცვლება ნებისმიერი create/write/delete-ის შემდეგ, ამიტომ
+        გამოდგება გამოთვლილი მნიშვნელობების memo-ს გასაღებად.
+        """
+        version = cls._business_days_cache.get('version')
+        if version is not None:
+            return version
+
+        table = cls.__table__()
+        cursor = Transaction().connection.cursor()
+        cursor.execute(*table.select(
+                Count(table.id), Max(table.create_date),
+                Max(table.write_date)))
+        version = ':'.join(str(v) for v in cursor.fetchone())
+        cls._business_days_cache.set('version', version)
+        return version
+
+    @classmethod
+    def business_day_index(cls, year, country=None):
+        """
+        წლის სამუშაო დღეების კუმულაციური ინდექსი (იხ. build_index).
+
+        ინდექსი იქეშება ქვეყნისა და წლის მიხედვით და იშლება
+        დღესასწაულების ნებისმიერი ცვლილებისას. country=None ნიშნავს
+        ყველა ქვეყნის აქტიურ დღესასწაულს.
+        """
+        country_id = getattr(country, 'id', country)
+        key = (country_id, year)
+        index = cls._business_days_cache.get(key)
+        if index is None:
+            index = cls._build_business_day_index(year, country_id)
+            cls._business_days_cache.set(key, index)
+        return index
+
+    @classmethod
+    @profiled
+    def _build_business_day_index(cls, year, country_id):
+        domain = [
+            ('date', '>=', dt.date(year, 1, 1)),
+            ('date', '<=', dt.date(year, 12, 31)),
+            ('active', '=', True),
+        ]
+        if country_id is not None:
+            domain.append(('country', '=', country_id))
+        holidays = cls.search_read(domain, fields_names=['date'])
+        return build_index(year, (h['date'] for h in holidays))
+
+    @classmethod
+    def count_business_days(cls, start_date, end_date, country=None):
+        """
+        სამუშაო დღეების რაოდენობა [start_date, end_date] შუალედში,
+        თითო წელზე ერთი გამოკლებით.
+        """
+        if not start_date or not end_date or start_date > end_date:
+            return 0
+        days = 0
+        for year in range(start_date.year, end_date.year + 1):
+            index = cls.business_day_index(year, country)
+            days += count_from_index(
+                index,
+                max(start_date, dt.date(year, 1, 1)),
+                min(end_date, dt.date(year, 12, 31)))
+        return days
@@ -0,0 +1,185 @@
+"""
+ღილაკების და სხვა მეთოდების პროფილირება (opt-in).
+
+ჩართვა trytond.conf-ში:
+
+    [ge_calendar]
+    profiling = True
+    # არასავალდებულო: JSON ხაზების ფაილი
+    profiling_export = /var/log/trytond/profiling.jsonl
+
+ან ერთი გამოძახებისთვის კონტექსტით: {'profiling': True}.
+
+თითო გამოძახებაზე იწერება: სახელი, ჩანაწერების რაოდენობა, დრო,
+SQL მოთხოვნები, წაკითხული და ჩაწერილი სტრიქონები. გამორთულ
+რეჟიმში დამატებითი ხარჯი ერთი შემოწმებაა.
+"""
+import json
+import logging
+import time
+from functools import wraps
+
+from trytond.config import config
+from trytond.transaction import Transaction
+
+logger = logging.getLogger(__name__)
+
+PROFILING = config.getboolean('ge_calendar', 'profiling', default=False)
+PROFILING_EXPORT = config.get('ge_calendar', 'profiling_export', default=None)
+
+_WRITE_STATEMENTS = {'INSERT', 'UPDATE', 'DELETE'}
+
+
+class _CountingCursor:
+    def __init__(self, cursor, counters):
+        self._cursor = cursor
+        self._counters = counters
+
+    def _count(self, name, value):
+        for counter in self._counters:
+            setattr(counter, name, getattr(counter, name) + value)
+
+    def _execute(self, method, query, *args, **kwargs):
+        self._count('queries', 1)
+        result = method(query, *args, **kwargs)
+        statement = str(query).lstrip()[:6].upper()
+        if statement in _WRITE_STATEMENTS and self._cursor.rowcount > 0:
+            self._count('rows_written', self._cursor.rowcount)
+        return self if result is self._cursor else result
+
+    def execute(self, query, *args, **kwargs):
+        return self._execute(self._cursor.execute, query, *args, **kwargs)
+
+    def executemany(self, query, *args, **kwargs):
+        return self._execute(
+            self._cursor.executemany, query, *args, **kwargs)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._count('rows_read', 1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._count('rows_read', len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._count('rows_read', len(rows))
+        return rows
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._count('rows_read', 1)
+            yield row
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        if hasattr(self._cursor, '__exit__'):
+            return self._cursor.__exit__(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class _CountingConnection:
+    def __init__(self, connection):
+        self._connection = connection
+        self._counters = []
+
+    def cursor(self, *args, **kwargs):
+        return _CountingCursor(
+            self._connection.cursor(*args, **kwargs), self._counters)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+class QueryCounter:
+    """
+    დროისა და SQL მოთხოვნების მთვლელი მიმდინარე ტრანზაქციისთვის.
+
+        with QueryCounter() as counter:
+            ...
+        counter.as_dict()
+
+    შეიძლება ჩაიდგას ერთმანეთში: თითოეული თავის მოთხოვნებს ითვლის.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.rows_read = 0
+        self.rows_written = 0
+        self.seconds = 0.0
+
+    def __enter__(self):
+        transaction = Transaction()
+        connection = transaction.connection
+        self._installed = not isinstance(connection, _CountingConnection)
+        if self._installed:
+            connection = transaction.connection = _CountingConnection(
+                connection)
+        connection._counters.append(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.seconds = time.perf_counter() - self._start
+        transaction = Transaction()
+        connection = transaction.connection
+        connection._counters.remove(self)
+        if self._installed:
+            transaction.connection = connection._connection
+
+    def as_dict(self):
+        return {
+            'seconds': round(self.seconds, 4),
+            'queries': self.queries,
+            'rows_read': self.rows_read,
+            'rows_written': self.rows_written,
+        }
+
+
+def _record(name, records, counter, error=None):
+    values = {'name': name, 'records': records}
+    values.update(counter.as_dict())
+    if error:
+        values['error'] = error
+    line = json.dumps(values)
+    logger.info(line)
+    if PROFILING_EXPORT:
+        with open(PROFILING_EXPORT, 'a') as fp:
+            fp.write(line + '\n')
+
+
+def profiled(func):
+    """
+    classmethod-ის (მაგ. ModelView.button-ის) პროფილირება.
+
+    სახელად იწერება '<model>.<method>', ჩანაწერებად – მეორე
+    არგუმენტის სიგრძე, თუ ის სიაა. შეცდომით დასრულებული გამოძახებაც
+    იწერება (error – გამონაკლისის კლასი).
+    """
+    @wraps(func)
+    def wrapper(cls, *args, **kwargs):
+        if not PROFILING and not Transaction().context.get('profiling'):
+            return func(cls, *args, **kwargs)
+
+        records = len(args[0]) \
+            if args and isinstance(args[0], (list, tuple)) else None
+        counter = QueryCounter()
+        error = None
+        try:
+            with counter:
+                return func(cls, *args, **kwargs)
+        except Exception as exception:
+            error = type(exception).__name__
+            raise
+        finally:
+            _record(
+                f'{cls.__name__}.{func.__name__}', records, counter, error)
+    return wrapper
@@ -4,8 +4,17 @@ from . import payroll
 
 def register():
     Pool.register(
+        payroll.Company,
         payroll.Contract,
         payroll.Payslip,
         payroll.PayslipLine,
+        payroll.PayrollRate,
+        payroll.Configuration,
+        payroll.RunPayrollStart,
+        payroll.RunPayrollResult,
         module='hr_payroll', type_='model',
     )
+    Pool.register(
+        payroll.RunPayroll,
+        module='hr_payroll', type_='wizard',
+    )
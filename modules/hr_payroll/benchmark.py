@@ -0,0 +1,181 @@
+"""
+hr_payroll-ის ბენჩმარკი in-memory SQLite ბაზაზე.
+
+ქმნის სინთეტიკურ კომპანიას N თანამშრომლით (კონტრაქტები, ანგარიშები,
+ჟურნალი, წლის დღესასწაულები) და ზომავს Payslip.compute,
+Payslip._create_move და Payslip.complete ფაზებს: დრო, SQL
+მოთხოვნები და წაკითხული/ჩაწერილი სტრიქონები. შედეგი ინახება
+JSON-ად, რომ კომიტებს შორის რეგრესია გამოჩნდეს.
+
+გამოყენება:
+    python -m trytond.modules.hr_payroll.benchmark \\
+        --sizes 100 1000 10000 --output payroll-benchmark.json
+"""
+import argparse
+import datetime as dt
+import json
+import os
+import subprocess
+from decimal import Decimal
+
+os.environ.setdefault('TRYTOND_DATABASE__URI', 'sqlite://')
+os.environ.setdefault('DB_NAME', ':memory:')
+
+from trytond.modules.ge_calendar.profiling import QueryCounter  # noqa: E402
+from trytond.pool import Pool  # noqa: E402
+from trytond.tests.test_tryton import (  # noqa: E402
+    activate_module, with_transaction)
+
+MODULES = ['hr_payroll']
+
+
+def create_company_data(size, year):
+    """
+    სინთეტიკური კომპანია: თანამშრომლები, კონტრაქტები, ანგარიშები,
+    ჟურნალი და წლის დღესასწაულები. აბრუნებს company-ს.
+    """
+    from trytond.modules.account.tests import create_chart, get_fiscalyear
+    from trytond.modules.company.tests import create_company
+
+    pool = Pool()
+    Account = pool.get('account.account')
+    AccountType = pool.get('account.account.type')
+    Contract = pool.get('hr.contract')
+    Country = pool.get('country.country')
+    Employee = pool.get('company.employee')
+    FiscalYear = pool.get('account.fiscalyear')
+    Journal = pool.get('account.journal')
+    Party = pool.get('party.party')
+    PublicHoliday = pool.get('ge.public_holiday')
+
+    company = create_company()
+    create_chart(company)
+    fiscalyear = get_fiscalyear(company, today=dt.date(year, 1, 1))
+    fiscalyear.save()
+    FiscalYear.create_period([fiscalyear])
+
+    georgia, = Country.create([{'name': 'Georgia', 'code': 'GE'}])
+    holidays = [
+        (1, 1), (1, 2), (1, 7), (1, 19), (3, 3), (3, 8), (4, 9), (5, 9),
+        (5, 12), (5, 26), (8, 28), (10, 14), (11, 23)]
+    PublicHoliday.create([{
+        'name': f"Holiday {month}-{day}",
+        'date': dt.date(year, month, day),
+        'country': georgia.id,
+    } for month, day in holidays])
+
+    expense, = Account.search([
+        ('type.expense', '=', True),
+        ('closed', '=', False),
+    ], limit=1)
+    payable_type, = AccountType.search([('payable', '=', True)], limit=1)
+    payable, tax, pension = Account.create([{
+        'name': name,
+        'code': code,
+        'type': payable_type.id,
+        'company': company.id,
+        'party_required': party_required,
+    } for name, code, party_required in [
+        ("Salary Payable", 'B-PAY', True),
+        ("Income Tax Payable", 'B-TAX', False),
+        ("Pension Payable", 'B-PEN', False),
+    ]])
+    journal, = Journal.search([('type', '=', 'general')], limit=1)
+
+    parties = Party.create([
+        {'name': f"Employee {i}"} for i in range(size)])
+    employees = Employee.create([
+        {'party': p.id, 'company': company.id} for p in parties])
+    Contract.create([{
+        'company': company.id,
+        'employee': employee.id,
+        'start_date': dt.date(year, 1, 1),
+        'wage': Decimal(800 + (i * 37) % 4000),
+        'currency': company.currency.id,
+        'journal': journal.id,
+        'expense_account': expense.id,
+        'payable_account': payable.id,
+        'tax_account': tax.id,
+        'pension_account': pension.id,
+        'pension_participant': bool(i % 5),
+    } for i, employee in enumerate(employees)])
+    return company
+
+
+def run_size(size, date_):
+    """ერთი ზომის ბენჩმარკი; აბრუნებს ფაზების შედეგებს."""
+    from trytond.modules.company.tests import set_company
+
+    pool = Pool()
+    Contract = pool.get('hr.contract')
+    Move = pool.get('account.move')
+    Payslip = pool.get('hr.payslip')
+
+    company = create_company_data(size, date_.year)
+    with set_company(company):
+        date_from = date_.replace(day=1)
+        date_to = date_.replace(day=28)
+        payslips = Payslip.create([{
+            'company': company.id,
+            'employee': c.employee.id,
+            'contract': c.id,
+            'date_from': date_from,
+            'date_to': date_to,
+            'currency': c.currency.id,
+        } for c in Contract.search([])])
+
+        phases = {}
+        with QueryCounter() as counter:
+            Payslip.compute(payslips)
+        phases['compute'] = counter.as_dict()
+
+        payslips = Payslip.browse([p.id for p in payslips])
+        with QueryCounter() as counter:
+            moves = [Payslip._create_move(p) for p in payslips]
+        phases['create_move'] = counter.as_dict()
+        Move.delete([m for m in moves if m])
+
+        payslips = Payslip.browse([p.id for p in payslips])
+        with QueryCounter() as counter:
+            Payslip.complete(payslips)
+        phases['complete'] = counter.as_dict()
+    return phases
+
+
+def _revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=os.path.dirname(__file__),
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        '--sizes', nargs='+', type=int, default=[100, 1000, 10000])
+    parser.add_argument('--output', default='payroll-benchmark.json')
+    options = parser.parse_args(args)
+
+    activate_module(MODULES)
+    # Account moves get their period from today, so run in the current month
+    today = dt.date.today()
+
+    results = []
+    for size in options.sizes:
+        phases = with_transaction()(run_size)(size, today)
+        results.append({'size': size, 'phases': phases})
+        print(size, json.dumps(phases))
+
+    with open(options.output, 'w') as fp:
+        json.dump({
+            'revision': _revision(),
+            'date': dt.datetime.now().isoformat(),
+            'results': results,
+        }, fp, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+ხელფასის გამოთვლის ბირთვი – ORM-ისგან დამოუკიდებელი.
+
+შემავალი მონაცემები სვეტებად (სიებად) გადაეცემა, შედეგიც სვეტებად
+ბრუნდება, ამიტომ ერთნაირად გამოდგება პეისლიპების დასათვლელად და
+მრავალწლიანი what-if სიმულაციებისთვის.
+"""
+from collections import namedtuple
+from decimal import Decimal, ROUND_HALF_UP
+
+ZERO = Decimal('0.00')
+
+Rates = namedtuple(
+    'Rates', ['pension_employee', 'pension_employer', 'income_tax'])
+
+# განაკვეთები, თუ განაკვეთების ცხრილში ჩანაწერი არ არის
+DEFAULT_RATES = Rates(
+    pension_employee=Decimal('0.02'),
+    pension_employer=Decimal('0.02'),
+    income_tax=Decimal('0.20'),
+)
+
+
+def round_amount(value):
+    """დამრგვალება 2 ათწილადზე."""
+    if value is None:
+        return None
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return value.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def compute(wages, paid_days, month_days, pension_flags, rates):
+    """
+    ხელფასის დათვლა სვეტებზე.
+
+    wages         – თვის ხელფასი (Decimal)
+    paid_days     – ასანაზღაურებელი დღეები
+    month_days    – თვის სამუშაო დღეები
+    pension_flags – საპენსიოს მონაწილეა თუ არა
+    rates         – Rates თითო სტრიქონზე
+
+    აბრუნებს სვეტების dict-ს: daily_rate, gross, pension_employee,
+    pension_employer, income_tax, net.
+    """
+    result = {
+        'daily_rate': [],
+        'gross': [],
+        'pension_employee': [],
+        'pension_employer': [],
+        'income_tax': [],
+        'net': [],
+    }
+    for wage, days, total, pension, rate in zip(
+            wages, paid_days, month_days, pension_flags, rates):
+        denominator = Decimal(total)
+
+        gross = ZERO
+        if total > 0 and days > 0:
+            gross = round_amount(wage / denominator * Decimal(days))
+        elif days > 0:
+            gross = round_amount(wage)
+
+        pension_employee = ZERO
+        pension_employer = ZERO
+        if pension and gross:
+            pension_employee = round_amount(gross * rate.pension_employee)
+            pension_employer = round_amount(gross * rate.pension_employer)
+
+        taxable_base = gross - pension_employee
+        income_tax = round_amount(taxable_base * rate.income_tax) \
+            if taxable_base > 0 else ZERO
+
+        result['daily_rate'].append(
+            round_amount(wage / denominator) if total else gross)
+        result['gross'].append(gross)
+        result['pension_employee'].append(pension_employee)
+        result['pension_employer'].append(pension_employer)
+        result['income_tax'].append(income_tax)
+        result['net'].append(gross - pension_employee - income_tax)
+    return result
@@ -1,39 +1,126 @@
 import calendar
-from datetime import timedelta
-from decimal import Decimal, ROUND_HALF_UP
-
-from trytond.model import ModelSQL, ModelView, Workflow, fields
+import functools
+import hashlib
+import logging
+import multiprocessing
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+from decimal import Decimal
+from weakref import WeakKeyDictionary
+
+from sql.aggregate import Count, Max
+
+from trytond import backend
+from trytond.cache import Cache
+from trytond.config import config
+from trytond.model import (
+    ModelSingleton, ModelSQL, ModelView, Workflow, fields)
 from trytond.pyson import Eval
-from trytond.pool import Pool
+from trytond.pool import Pool, PoolMeta
+from trytond.transaction import Transaction
+from trytond.wizard import Button, StateTransition, StateView, Wizard
+
+from trytond.modules.ge_calendar.profiling import profiled
+
+from . import kernel
+from .kernel import round_amount  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+# Run Payroll: რამდენ პროცესზე და რა ზომის ნაწილებად დაიყოს დათვლა
+RUN_WORKERS = config.getint(
+    'hr_payroll', 'run_workers', default=os.cpu_count() or 1)
+RUN_CHUNK_SIZE = config.getint('hr_payroll', 'run_chunk_size', default=500)
 
 
-def round_amount(value):
-    """დამრგვალება 2 ათწილადზე."""
-    if value is None:
-        return None
-    if not isinstance(value, Decimal):
-        value = Decimal(str(value))
-    return value.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+def _percent(rate):
+    """განაკვეთის ჩვენება პროცენტად: Decimal('0.02') → '2'."""
+    return format((rate * 100).normalize(), 'f')
 
 
-def count_business_days(start_date, end_date, holidays=None):
+class MonthTotals:
     """
-    ითვლის სამუშაო დღეებს (ორშაბათი-პარასკევი), გამოკლებით დღესასწაულებისა.
+    თვის სამუშაო დღეების memo ერთი ტრანზაქციის ფარგლებში.
+
+    გასაღები: (წელი, თვე, დღესასწაულების ვერსია). მნიშვნელობა:
+    (სამუშაო დღეები, Decimal მნიშვნელი დღიური განაკვეთისთვის).
     """
-    if not start_date or not end_date:
-        return 0
+    _memos = WeakKeyDictionary()
+
+    def __init__(self):
+        self.values = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def get(cls):
+        transaction = Transaction()
+        memo = cls._memos.get(transaction)
+        if memo is None:
+            memo = cls._memos[transaction] = cls()
+        return memo
+
+    def month(self, year, month):
+        PublicHoliday = Pool().get('ge.public_holiday')
+        key = (year, month, PublicHoliday.holiday_version())
+        value = self.values.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
 
-    if holidays is None:
-        holidays = set()
+        self.misses += 1
+        last_day_of_month = calendar.monthrange(year, month)[1]
+        days = PublicHoliday.count_business_days(
+            date(year, month, 1), date(year, month, last_day_of_month))
+        value = self.values[key] = (days, Decimal(days))
+        return value
 
-    days = 0
-    current = start_date
-    while current <= end_date:
-        # 0=ორშაბათი ... 4=პარასკევი
-        if current.weekday() < 5 and current not in holidays:
-            days += 1
-        current += timedelta(days=1)
-    return days
+
+class Company(metaclass=PoolMeta):
+    __name__ = 'company.company'
+
+    _payroll_currency_cache = Cache(
+        'company.company.payroll_currency', context=False)
+
+    @classmethod
+    def create(cls, vlist):
+        companies = super().create(vlist)
+        cls._payroll_currency_cache.clear()
+        return companies
+
+    @classmethod
+    def write(cls, *args):
+        super().write(*args)
+        cls._payroll_currency_cache.clear()
+
+    @classmethod
+    def delete(cls, companies):
+        super().delete(companies)
+        cls._payroll_currency_cache.clear()
+
+    @classmethod
+    def get_payroll_currency(cls):
+        """
+        კონტექსტის კომპანიის ვალუტის id (ქეშიდან).
+
+        თუ კონტექსტში კომპანია არ არის, როგორც ადრე – პირველი
+        კომპანიის ვალუტა.
+        """
+        company_id = Transaction().context.get('company')
+        currency_id = cls._payroll_currency_cache.get(company_id, -1)
+        if currency_id != -1:
+            return currency_id
+
+        if company_id is not None and company_id >= 0:
+            company = cls(company_id)
+        else:
+            companies = cls.search([], limit=1)
+            company = companies[0] if companies else None
+        currency_id = company.currency.id if company else None
+        cls._payroll_currency_cache.set(company_id, currency_id)
+        return currency_id
 
 
 class Contract(ModelSQL, ModelView):
@@ -60,23 +147,23 @@ class Contract(ModelSQL, ModelView):
     # --- ანგარიშები ---
     expense_account = fields.Many2One(
         'account.account', "Salary Expense Account",
-        domain=[('type', '=', 'expense')])
+        domain=[('type.expense', '=', True)])
 
     payable_account = fields.Many2One(
         'account.account', "Salary Payable Account",
-        domain=[('type', '=', 'payable')])
+        domain=[('type.payable', '=', True)])
 
     tax_account = fields.Many2One(
         'account.account', "Income Tax Account",
-        domain=[('type', '=', 'payable')])
+        domain=[('type.payable', '=', True)])
 
     pension_account = fields.Many2One(
         'account.account', "Pension Account",
-        domain=[('type', '=', 'payable')])
+        domain=[('type.payable', '=', True)])
 
     employer_pension_expense_account = fields.Many2One(
         'account.account', "Employer Pension Expense Account",
-        domain=[('type', '=', 'expense')])
+        domain=[('type.expense', '=', True)])
 
     # --- პარამეტრები ---
     pension_participant = fields.Boolean("Pension Participant")
@@ -96,10 +183,7 @@ class Contract(ModelSQL, ModelView):
         კონტრაქტის ვალუტა დეფოლტად კომპანიის ვალუტა.
         """
         Company = Pool().get('company.company')
-        companies = Company.search([], limit=1)
-        if companies:
-            return companies[0].currency.id
-        return None
+        return Company.get_payroll_currency()
 
 
 class Payslip(Workflow, ModelSQL, ModelView):
@@ -172,6 +256,8 @@ class Payslip(Workflow, ModelSQL, ModelView):
 
     move = fields.Many2One('account.move', "Account Move", readonly=True)
 
+    compute_fingerprint = fields.Char("Compute Fingerprint", readonly=True)
+
     @staticmethod
     def default_state():
         return 'draft'
@@ -182,10 +268,26 @@ class Payslip(Workflow, ModelSQL, ModelView):
         პეისლიპის ვალუტა დეფოლტად – კომპანიის ვალუტა.
         """
         Company = Pool().get('company.company')
-        companies = Company.search([], limit=1)
-        if companies:
-            return companies[0].currency.id
-        return None
+        return Company.get_payroll_currency()
+
+    @classmethod
+    def write(cls, *args):
+        # ხაზების ხელით შეცვლისას ანაბეჭდი აღარ არის ვალიდური
+        args = list(args)
+        for i in range(1, len(args), 2):
+            values = args[i]
+            if 'lines' in values and 'compute_fingerprint' not in values:
+                args[i] = dict(values, compute_fingerprint=None)
+        super().write(*args)
+
+    @classmethod
+    def copy(cls, payslips, default=None):
+        if default is None:
+            default = {}
+        else:
+            default = default.copy()
+        default.setdefault('compute_fingerprint', None)
+        return super().copy(payslips, default=default)
 
     @classmethod
     def __setup__(cls):
@@ -224,178 +326,340 @@ class Payslip(Workflow, ModelSQL, ModelView):
 
     @classmethod
     @ModelView.button
+    @profiled
     def compute(cls, payslips):
         """
         ხელფასის დათვლა: სამუშაო დღეები, პენსია, საშემოსავლო, ხაზები.
+
+        დათვლა ხდება ერთიანად (batch): კონტრაქტები იკითხება ერთხელ,
+        თანხები ითვლება მეხსიერებაში, ჩაწერა ხდება იდენტური
+        მნიშვნელობების მიხედვით დაჯგუფებით.
+
+        პეისლიპი, რომლის შემავალი მონაცემების ანაბეჭდი (fingerprint)
+        არ შეცვლილა, გამოიტოვება; დანარჩენების ხაზები ახლდება
+        ადგილზე – იცვლება მხოლოდ ის, რაც განსხვავდება.
         """
-        PublicHoliday = Pool().get('ge.public_holiday')
-        Line = Pool().get('hr.payslip.line')
-
-        all_dates = [
-            p.date_from for p in payslips if p.date_from
-        ] + [
-            p.date_to for p in payslips if p.date_to
-        ]
-
-        holiday_set = set()
-        if all_dates:
-            min_date = min(all_dates).replace(day=1)
-            max_date = max(all_dates) + timedelta(days=32)
-            try:
-                holidays = PublicHoliday.search([
-                    ('date', '>=', min_date),
-                    ('date', '<=', max_date),
-                    ('active', '=', True),
-                ])
-                holiday_set = {h.date for h in holidays}
-            except Exception:
-                holiday_set = set()
+        pool = Pool()
+        Contract = pool.get('hr.contract')
+        Line = pool.get('hr.payslip.line')
 
+        # კონტრაქტების წინასწარი წაკითხვა ერთი read-ით
+        contract_ids = {p.contract.id for p in payslips if p.contract}
+        contracts = {c.id: c for c in Contract.browse(list(contract_ids))}
+
+        memo = MonthTotals.get()
+        hits, misses = memo.hits, memo.misses
+
+        rows = []
         for payslip in payslips:
-            contract = payslip.contract
+            contract = contracts.get(
+                payslip.contract.id if payslip.contract else None)
             if not contract or not payslip.date_from or not payslip.date_to:
                 continue
+            if (payslip.compute_fingerprint
+                    and payslip.compute_fingerprint == cls._fingerprint(
+                        payslip, contract, payslip.paid_days)):
+                continue
+            rows.append((
+                    payslip, contract,
+                    cls._compute_inputs(payslip, contract)))
+
+        logger.debug(
+            "month totals: %s hits, %s misses",
+            memo.hits - hits, memo.misses - misses)
+
+        if not rows:
+            return
+
+        inputs = [i for _, _, i in rows]
+        results = kernel.compute(
+            [i['wage'] for i in inputs],
+            [i['paid_days'] for i in inputs],
+            [i['month_denominator'] for i in inputs],
+            [i['pension_participant'] for i in inputs],
+            [i['rates'] for i in inputs])
+
+        to_write = defaultdict(list)
+        new_lines = {}
+        for index, (payslip, contract, payslip_inputs) in enumerate(rows):
+            result = {k: v[index] for k, v in results.items()}
+            values, lines = cls._compute_values(
+                payslip, payslip_inputs, result)
+            values['compute_fingerprint'] = cls._fingerprint(
+                payslip, contract, values['paid_days'])
+            key = tuple(sorted(values.items()))
+            to_write[key].append(payslip)
+            for line in lines:
+                new_lines[(payslip.id, line['code'])] = line
+
+        args = []
+        for key, records in to_write.items():
+            args.extend((records, dict(key)))
+        cls.write(*args)
+
+        # ხაზების განახლება ადგილზე: წაშლა, ჩაწერა და შექმნა –
+        # თითოეული ერთი გამოძახებით
+        to_delete = []
+        lines_to_write = defaultdict(list)
+        for line in Line.search([
+                    ('payslip', 'in', [p.id for p, _, _ in rows]),
+                ]):
+            values = new_lines.pop((line.payslip.id, line.code), None)
+            if values is None:
+                to_delete.append(line)
+                continue
+            changes = {
+                name: value for name, value in values.items()
+                if getattr(line, name) != value}
+            changes.pop('payslip', None)
+            if changes:
+                lines_to_write[tuple(sorted(changes.items()))].append(line)
+
+        if to_delete:
+            Line.delete(to_delete)
+        if lines_to_write:
+            args = []
+            for key, records in lines_to_write.items():
+                args.extend((records, dict(key)))
+            Line.write(*args)
+        if new_lines:
+            Line.create(list(new_lines.values()))
 
-            full_wage = Decimal(str(contract.wage or 0))
+    @classmethod
+    def _fingerprint(cls, payslip, contract, paid_days):
+        """
+        დათვლის შემავალი მონაცემების ანაბეჭდი: ხელფასი, საპენსიო,
+        თარიღები, ასანაზღაურებელი დღეები, დღესასწაულების და
+        განაკვეთების ვერსიები.
+        """
+        pool = Pool()
+        PublicHoliday = pool.get('ge.public_holiday')
+        Rate = pool.get('hr.payroll.rate')
+
+        key = '|'.join(str(v) for v in [
+            Decimal(str(contract.wage or 0)),
+            bool(contract.pension_participant),
+            payslip.date_from,
+            payslip.date_to,
+            paid_days,
+            PublicHoliday.holiday_version(),
+            Rate.rate_version(),
+        ])
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
 
-            # 1. თვის სამუშაო დღეები
-            year = payslip.date_from.year
-            month = payslip.date_from.month
-            last_day_of_month = calendar.monthrange(year, month)[1]
+    @classmethod
+    def _compute_inputs(cls, payslip, contract):
+        """
+        კერნელის შემავალი მონაცემები ერთი პეისლიპისთვის:
+        ხელფასი, სამუშაო დღეები, თვის დღეები, საპენსიო, განაკვეთები.
+        """
+        pool = Pool()
+        PublicHoliday = pool.get('ge.public_holiday')
+        Rate = pool.get('hr.payroll.rate')
+
+        # 1. თვის სამუშაო დღეები
+        total_month_business_days, month_denominator = \
+            MonthTotals.get().month(
+                payslip.date_from.year, payslip.date_from.month)
+
+        # 2. ნამუშევარი დღეები
+        worked_business_days = PublicHoliday.count_business_days(
+            payslip.date_from, payslip.date_to)
+
+        # თუ paid_days არ არის მითითებული → worked_business_days
+        days_to_pay = payslip.paid_days \
+            if payslip.paid_days is not None else worked_business_days
+
+        return {
+            'wage': Decimal(str(contract.wage or 0)),
+            'working_days': worked_business_days,
+            'paid_days': days_to_pay,
+            'month_days': total_month_business_days,
+            'month_denominator': month_denominator,
+            'pension_participant': bool(contract.pension_participant),
+            'rates': Rate.get_rates(payslip.date_from),
+        }
 
-            month_start = payslip.date_from.replace(day=1)
-            month_end = payslip.date_from.replace(day=last_day_of_month)
+    @classmethod
+    def _compute_values(cls, payslip, inputs, result):
+        """
+        კერნელის შედეგიდან პეისლიპის მნიშვნელობები და ხაზები.
 
-            total_month_business_days = count_business_days(
-                month_start, month_end, holiday_set)
+        აბრუნებს (პეისლიპის მნიშვნელობები, ხაზების მნიშვნელობები).
+        """
+        days_to_pay = inputs['paid_days']
+        total_month_business_days = inputs['month_days']
+        rates = inputs['rates']
 
-            # 2. ნამუშევარი დღეები
-            worked_business_days = count_business_days(
-                payslip.date_from, payslip.date_to, holiday_set)
+        gross = result['gross']
+        pension_employee = result['pension_employee']
+        pension_employer = result['pension_employer']
+        income_tax = result['income_tax']
+        net = result['net']
 
-            cls.write([payslip], {
-                'working_days': worked_business_days,
-            })
+        values = {
+            'working_days': inputs['working_days'],
+            'paid_days': days_to_pay,
+            'gross': gross,
+            'pension_employee': pension_employee,
+            'pension_employer': pension_employer,
+            'income_tax': income_tax,
+            'net': net,
+        }
 
-            # თუ paid_days არ არის მითითებული → worked_business_days
-            days_to_pay = payslip.paid_days \
-                if payslip.paid_days is not None else worked_business_days
-
-            # 3. Gross salary
-            gross = Decimal('0.00')
-            if total_month_business_days > 0 and days_to_pay > 0:
-                daily_rate = full_wage / Decimal(total_month_business_days)
-                gross = round_amount(daily_rate * Decimal(days_to_pay))
-            elif days_to_pay > 0:
-                gross = round_amount(full_wage)
-
-            # 4. პენსია და საშემოსავლო
-            pension_employee = Decimal('0.00')
-            pension_employer = Decimal('0.00')
-
-            if contract.pension_participant and gross:
-                pension_employee = round_amount(gross * Decimal('0.02'))
-                pension_employer = round_amount(gross * Decimal('0.02'))
-
-            pension_total_deduction = pension_employee
-
-            taxable_base = gross - pension_total_deduction
-            income_tax = round_amount(taxable_base * Decimal('0.20')) \
-                if taxable_base > 0 else Decimal('0.00')
-
-            net = gross - pension_total_deduction - income_tax
-
-            cls.write([payslip], {
-                'paid_days': days_to_pay,
-                'gross': gross,
-                'pension_employee': pension_employee,
-                'pension_employer': pension_employer,
-                'income_tax': income_tax,
-                'net': net,
+        lines = []
+
+        if gross:
+            desc = f"Basic Salary ({days_to_pay}/{total_month_business_days} days)"
+            lines.append({
+                'payslip': payslip.id,
+                'name': desc,
+                'code': "BASIC",
+                'category': 'basic',
+                'quantity': Decimal(days_to_pay),
+                'rate': result['daily_rate'],
+                'amount': gross,
             })
 
-            # 5. ხაზების გენერაცია
-            if payslip.lines:
-                Line.delete(payslip.lines)
-
-            lines_to_create = []
-
-            if gross:
-                desc = f"Basic Salary ({days_to_pay}/{total_month_business_days} days)"
-                lines_to_create.append({
-                    'payslip': payslip.id,
-                    'name': desc,
-                    'code': "BASIC",
-                    'category': 'basic',
-                    'quantity': Decimal(days_to_pay),
-                    'rate': round_amount(
-                        full_wage / Decimal(total_month_business_days)
-                    ) if total_month_business_days else gross,
-                    'amount': gross,
-                })
-
-            if pension_employee:
-                lines_to_create.append({
-                    'payslip': payslip.id,
-                    'name': "Pension (Employee 2%)",
-                    'code': "PEN_EMP",
-                    'category': 'deduction',
-                    'quantity': Decimal('1'),
-                    'rate': pension_employee,
-                    'amount': -pension_employee,
-                })
+        if pension_employee:
+            lines.append({
+                'payslip': payslip.id,
+                'name': (
+                    "Pension (Employee "
+                    f"{_percent(rates.pension_employee)}%)"),
+                'code': "PEN_EMP",
+                'category': 'deduction',
+                'quantity': Decimal('1'),
+                'rate': pension_employee,
+                'amount': -pension_employee,
+            })
 
-            if pension_employer:
-                lines_to_create.append({
-                    'payslip': payslip.id,
-                    'name': "Pension (Employer 2%)",
-                    'code': "PEN_ER",
-                    'category': 'other',
-                    'quantity': Decimal('1'),
-                    'rate': pension_employer,
-                    'amount': pension_employer,
-                })
+        if pension_employer:
+            lines.append({
+                'payslip': payslip.id,
+                'name': (
+                    "Pension (Employer "
+                    f"{_percent(rates.pension_employer)}%)"),
+                'code': "PEN_ER",
+                'category': 'other',
+                'quantity': Decimal('1'),
+                'rate': pension_employer,
+                'amount': pension_employer,
+            })
 
-            if income_tax:
-                lines_to_create.append({
-                    'payslip': payslip.id,
-                    'name': "Income Tax 20%",
-                    'code': "TAX",
-                    'category': 'tax',
-                    'quantity': Decimal('1'),
-                    'rate': income_tax,
-                    'amount': -income_tax,
-                })
+        if income_tax:
+            lines.append({
+                'payslip': payslip.id,
+                'name': f"Income Tax {_percent(rates.income_tax)}%",
+                'code': "TAX",
+                'category': 'tax',
+                'quantity': Decimal('1'),
+                'rate': income_tax,
+                'amount': -income_tax,
+            })
 
-            if net:
-                lines_to_create.append({
-                    'payslip': payslip.id,
-                    'name': "Net Salary",
-                    'code': "NET",
-                    'category': 'other',
-                    'quantity': Decimal('1'),
-                    'rate': net,
-                    'amount': net,
-                })
+        if net:
+            lines.append({
+                'payslip': payslip.id,
+                'name': "Net Salary",
+                'code': "NET",
+                'category': 'other',
+                'quantity': Decimal('1'),
+                'rate': net,
+                'amount': net,
+            })
 
-            if lines_to_create:
-                Line.create(lines_to_create)
+        return values, lines
 
     @classmethod
     @ModelView.button
+    @profiled
     @Workflow.transition('done')
     def complete(cls, payslips):
         """
         პეისლიპის დასრულება და ბუღალტრული გატარების შექმნა.
+
+        კონფიგურაციის posting_mode-ის მიხედვით იქმნება ან თითო
+        გატარება თითო პეისლიპზე, ან ერთი გატარება ჟურნალსა და
+        თარიღზე ყველა პეისლიპისთვის ერთად.
+        """
+        Configuration = Pool().get('hr.payroll.configuration')
+
+        to_post = [p for p in payslips if not p.move]
+        if Configuration(1).posting_mode == 'consolidated':
+            cls._create_consolidated_moves(to_post)
+            return
+
+        for payslip in to_post:
+            move = cls._create_move(payslip)
+            if move:
+                cls.write([payslip], {'move': move.id})
+
+    @classmethod
+    def _create_consolidated_moves(cls, payslips):
+        """
+        ერთი გატარება თითო (ჟურნალი, თარიღი)-ზე.
+
+        ხაზები ჯამდება ანგარიშის, პარტნიორისა და აღწერის მიხედვით,
+        ყველა გატარება იქმნება ერთი Move.create-ით.
         """
+        Move = Pool().get('account.move')
+
+        groups = defaultdict(list)
         for payslip in payslips:
-            if not payslip.move:
-                move = cls._create_move(payslip)
-                if move:
-                    cls.write([payslip], {'move': move.id})
+            values = cls._get_move(payslip)
+            if values:
+                groups[(values['journal'], values['date'])].append(
+                    (payslip, values['lines'][0][1]))
+        if not groups:
+            return
+
+        vlist = []
+        for (journal, date_), items in groups.items():
+            totals = {}
+            for payslip, move_lines in items:
+                for line in move_lines:
+                    key = (
+                        line['account'], line.get('party'),
+                        line['description'])
+                    debit, credit = totals.get(
+                        key, (Decimal('0'), Decimal('0')))
+                    totals[key] = (
+                        debit + line['debit'], credit + line['credit'])
+            vlist.append({
+                'journal': journal,
+                'date': date_,
+                'description': f"Payroll {date_}",
+                'lines': [('create', [{
+                    'description': description,
+                    'account': account,
+                    'party': party,
+                    'debit': debit,
+                    'credit': credit,
+                } for (account, party, description), (debit, credit)
+                    in totals.items()])],
+            })
+        moves = Move.create(vlist)
+
+        args = []
+        for move, items in zip(moves, groups.values()):
+            args.extend(([p for p, _ in items], {'move': move.id}))
+        cls.write(*args)
 
     @classmethod
     def _create_move(cls, payslip):
+        """ერთი პეისლიპის გატარების შექმნა."""
+        Move = Pool().get('account.move')
+
+        values = cls._get_move(payslip)
+        if not values:
+            return None
+
+        move, = Move.create([values])
+        return move
+
+    @classmethod
+    def _get_move(cls, payslip):
         """
         გატარება:
         Dr Salary Expense
@@ -408,7 +672,6 @@ class Payslip(Workflow, ModelSQL, ModelView):
         if not contract or not contract.journal:
             return None
 
-        Move = Pool().get('account.move')
         Date = Pool().get('ir.date')
 
         move_lines = []
@@ -428,7 +691,7 @@ class Payslip(Workflow, ModelSQL, ModelView):
                 contract.expense_account
             if acc:
                 move_lines.append({
-                    'description': "Pension Expense (Employer 2%)",
+                    'description': "Pension Expense (Employer)",
                     'account': acc.id,
                     'debit': payslip.pension_employer,
                     'credit': Decimal('0'),
@@ -476,12 +739,11 @@ class Payslip(Workflow, ModelSQL, ModelView):
             ),
             'lines': [('create', move_lines)],
         }
-
-        move, = Move.create([values])
-        return move
+        return values
 
     @classmethod
     @ModelView.button
+    @profiled
     @Workflow.transition('draft')
     def reset_to_draft(cls, payslips):
         """სტატუსის დაბრუნება draft-ზე."""
@@ -489,12 +751,118 @@ class Payslip(Workflow, ModelSQL, ModelView):
 
     @classmethod
     @ModelView.button
+    @profiled
     @Workflow.transition('cancelled')
     def cancel(cls, payslips):
         """პეისლიპის გაუქმება (ამ ეტაპზე მხოლოდ სტატუსი)."""
         pass
 
 
+class PayrollRate(ModelSQL, ModelView):
+    "Payroll Rate"
+    __name__ = 'hr.payroll.rate'
+
+    type = fields.Selection([
+        ('pension_employee', "Pension (Employee)"),
+        ('pension_employer', "Pension (Employer)"),
+        ('income_tax', "Income Tax"),
+    ], "Type", required=True)
+    rate = fields.Numeric(
+        "Rate", digits=(16, 4), required=True,
+        help="Fraction of the base, e.g. 0.02 for 2%.")
+    start_date = fields.Date(
+        "Start Date", required=True,
+        help="The rate applies from this date until the next one.")
+
+    _rates_cache = Cache('hr.payroll.rate.rates', context=False)
+
+    @classmethod
+    def __setup__(cls):
+        super().__setup__()
+        cls._order.insert(0, ('start_date', 'DESC'))
+
+    @classmethod
+    def create(cls, vlist):
+        records = super().create(vlist)
+        cls._rates_cache.clear()
+        return records
+
+    @classmethod
+    def write(cls, *args):
+        super().write(*args)
+        cls._rates_cache.clear()
+
+    @classmethod
+    def delete(cls, records):
+        super().delete(records)
+        cls._rates_cache.clear()
+
+    @classmethod
+    def _get_table(cls):
+        """ყველა განაკვეთი: {type: [(start_date, rate), ...]} ზრდადობით."""
+        table = cls._rates_cache.get('table')
+        if table is not None:
+            return table
+
+        table = defaultdict(list)
+        for record in cls.search([], order=[('start_date', 'ASC')]):
+            table[record.type].append((record.start_date, record.rate))
+        table = dict(table)
+        cls._rates_cache.set('table', table)
+        return table
+
+    @classmethod
+    def rate_version(cls):
+        """განაკვეთების ცხრილის ვერსია; იცვლება ყოველი ცვლილებისას."""
+        version = cls._rates_cache.get('version')
+        if version is not None:
+            return version
+
+        table = cls.__table__()
+        cursor = Transaction().connection.cursor()
+        cursor.execute(*table.select(
+                Count(table.id), Max(table.create_date),
+                Max(table.write_date)))
+        version = ':'.join(str(v) for v in cursor.fetchone())
+        cls._rates_cache.set('version', version)
+        return version
+
+    @classmethod
+    def get_rates(cls, date_):
+        """
+        თარიღზე მოქმედი განაკვეთები (kernel.Rates).
+
+        თუ ტიპისთვის ჩანაწერი არ არსებობს, გამოიყენება
+        kernel.DEFAULT_RATES.
+        """
+        table = cls._get_table()
+        values = {}
+        for name in kernel.Rates._fields:
+            value = getattr(kernel.DEFAULT_RATES, name)
+            for start_date, rate in table.get(name, []):
+                if start_date > date_:
+                    break
+                value = rate
+            values[name] = value
+        return kernel.Rates(**values)
+
+
+class Configuration(ModelSingleton, ModelSQL, ModelView):
+    "Payroll Configuration"
+    __name__ = 'hr.payroll.configuration'
+
+    posting_mode = fields.Selection([
+        ('payslip', "Per Payslip"),
+        ('consolidated', "Consolidated"),
+    ], "Posting Mode", required=True,
+        help="Consolidated posting creates one account move per journal "
+        "and date for all payslips completed together.")
+
+    @staticmethod
+    def default_posting_mode():
+        return 'payslip'
+
+
 class PayslipLine(ModelSQL, ModelView):
     "Payslip Line"
     __name__ = 'hr.payslip.line'
@@ -516,3 +884,257 @@ class PayslipLine(ModelSQL, ModelView):
     quantity = fields.Numeric("Quantity", digits=(16, 2), required=True)
     rate = fields.Numeric("Rate", digits=(16, 2), required=True)
     amount = fields.Numeric("Amount", digits=(16, 2), required=True)
+
+
+def _init_worker(options, database_name):
+    """
+    spawn-ით გაშვებული პროცესის მომზადება: მშობლის კონფიგურაცია და
+    ბაზის Pool (მშობლის ნაკადი და კავშირი არ კოპირდება).
+    """
+    for section, values in options.items():
+        if not config.has_section(section):
+            config.add_section(section)
+        for option, value in values.items():
+            config.set(section, option, value)
+    Pool.start()
+    pool = Pool(database_name)
+    with Transaction().start(database_name, 0, readonly=True):
+        pool.init()
+
+
+def _compute_chunk(database_name, user, context, payslip_ids):
+    """
+    პეისლიპების ნაწილის დათვლა ცალკე ტრანზაქციაში.
+
+    თუ მთელი ნაწილი ვერ დაითვალა, თითო პეისლიპს ცალ-ცალკე ვცდით,
+    რომ შეცდომის ანგარიშში ზუსტად მოხვდეს პრობლემური ჩანაწერები.
+    აბრუნებს (დათვლილი ids, [(id, შეცდომა), ...]).
+    """
+    def compute(ids):
+        with Transaction(new=True).start(
+                database_name, user, context=context):
+            Payslip = Pool().get('hr.payslip')
+            Payslip.compute(Payslip.browse(ids))
+
+    try:
+        compute(payslip_ids)
+        return list(payslip_ids), []
+    except Exception:
+        logger.debug("chunk of %s payslips failed", len(payslip_ids),
+            exc_info=True)
+
+    done, errors = [], []
+    for payslip_id in payslip_ids:
+        try:
+            compute([payslip_id])
+        except Exception as exception:
+            errors.append((payslip_id, str(exception)))
+        else:
+            done.append(payslip_id)
+    return done, errors
+
+
+class RunPayrollStart(ModelView):
+    "Run Payroll"
+    __name__ = 'hr.payroll.run.start'
+
+    company = fields.Many2One('company.company', "Company", required=True)
+    date_from = fields.Date("From", required=True)
+    date_to = fields.Date(
+        "To", required=True,
+        domain=[('date_to', '>=', Eval('date_from'))],
+        depends=['date_from'])
+
+    @staticmethod
+    def default_company():
+        return Transaction().context.get('company')
+
+    @staticmethod
+    def default_date_from():
+        Date = Pool().get('ir.date')
+        return Date.today().replace(day=1)
+
+    @staticmethod
+    def default_date_to():
+        Date = Pool().get('ir.date')
+        today = Date.today()
+        return today.replace(
+            day=calendar.monthrange(today.year, today.month)[1])
+
+
+class RunPayrollResult(ModelView):
+    "Run Payroll Result"
+    __name__ = 'hr.payroll.run.result'
+
+    created = fields.Integer("Created", readonly=True)
+    skipped = fields.Integer(
+        "Skipped", readonly=True,
+        help="Contracts that already have a payslip for the period.")
+    computed = fields.Integer("Computed", readonly=True)
+    failed = fields.Integer("Failed", readonly=True)
+    report = fields.Text("Report", readonly=True)
+
+
+class RunPayroll(Wizard):
+    "Run Payroll"
+    __name__ = 'hr.payroll.run'
+
+    start = StateView(
+        'hr.payroll.run.start',
+        'hr_payroll.payroll_run_start_view_form', [
+            Button("Cancel", 'end', 'tryton-cancel'),
+            Button("Run", 'run', 'tryton-ok', default=True),
+        ])
+    run = StateTransition()
+    result = StateView(
+        'hr.payroll.run.result',
+        'hr_payroll.payroll_run_result_view_form', [
+            Button("Close", 'end', 'tryton-close', default=True),
+        ])
+
+    def transition_run(self):
+        payslips, skipped = self.create_payslips()
+        computed, errors = self.compute_payslips(payslips)
+
+        Payslip = Pool().get('hr.payslip')
+        lines = []
+        if errors:
+            lines.append(
+                "Computed payslips are saved; "
+                "the payslips below stay in draft:")
+        for payslip_id, message in errors:
+            payslip = Payslip(payslip_id)
+            lines.append(f"{payslip.employee.rec_name}: {message}")
+
+        self.result.created = len(payslips)
+        self.result.skipped = skipped
+        self.result.computed = computed
+        self.result.failed = len(errors)
+        self.result.report = '\n'.join(lines)
+        return 'result'
+
+    def default_result(self, fields):
+        return {
+            'created': self.result.created,
+            'skipped': self.result.skipped,
+            'computed': self.result.computed,
+            'failed': self.result.failed,
+            'report': self.result.report,
+        }
+
+    def create_payslips(self):
+        """
+        აქტიური კონტრაქტებისთვის draft პეისლიპების შექმნა ერთი create-ით.
+
+        კონტრაქტები, რომლებსაც ამ პერიოდზე უკვე აქვთ პეისლიპი,
+        გამოტოვებულია.
+        """
+        pool = Pool()
+        Contract = pool.get('hr.contract')
+        Payslip = pool.get('hr.payslip')
+
+        date_from = self.start.date_from
+        date_to = self.start.date_to
+
+        contracts = Contract.search([
+            ('company', '=', self.start.company.id),
+            ('active', '=', True),
+            ('start_date', '<=', date_to),
+            ['OR',
+                ('end_date', '=', None),
+                ('end_date', '>=', date_from),
+            ],
+        ])
+        existing = {p.contract.id for p in Payslip.search([
+            ('contract', 'in', [c.id for c in contracts]),
+            ('date_from', '<=', date_to),
+            ('date_to', '>=', date_from),
+            ('state', '!=', 'cancelled'),
+        ])}
+
+        to_create = []
+        for contract in contracts:
+            if contract.id in existing:
+                continue
+            end_date = date_to
+            if contract.end_date and contract.end_date < end_date:
+                end_date = contract.end_date
+            to_create.append({
+                'company': contract.company.id,
+                'employee': contract.employee.id,
+                'contract': contract.id,
+                'date_from': max(date_from, contract.start_date),
+                'date_to': end_date,
+                'currency': contract.currency.id,
+            })
+        return Payslip.create(to_create), len(existing)
+
+    def compute_payslips(self, payslips):
+        """
+        პეისლიპების დათვლა ნაწილებად, თითოეული საკუთარი ტრანზაქციით
+        (იხ. _compute_chunk), ამიტომ შექმნილი პეისლიპები ჯერ უნდა
+        დაკომიტდეს.
+
+        გაშვება ნაწილობრივ შეიძლება დასრულდეს: დათვლილი პეისლიპები
+        ინახება, წარუმატებლები draft-ში რჩება და ბრუნდება შეცდომებში
+        (მთელი ნაწილის ჩავარდნისას – ნაწილის ყველა პეისლიპი).
+
+        თუ რამდენიმე worker-ია კონფიგურირებული, ნაწილები ითვლება
+        ცალკეულ (spawn) პროცესებში, სხვა შემთხვევაში – ამავე პროცესში.
+        აბრუნებს (დათვლილების რაოდენობა, [(id, შეცდომა), ...]).
+        """
+        transaction = Transaction()
+        ids = [p.id for p in payslips]
+        chunks = [
+            ids[i:i + RUN_CHUNK_SIZE]
+            for i in range(0, len(ids), RUN_CHUNK_SIZE)]
+        if not chunks:
+            return 0, []
+
+        transaction.commit()
+        args = (
+            transaction.database.name, transaction.user,
+            dict(transaction.context))
+        workers = min(RUN_WORKERS, len(chunks))
+        if workers <= 1 or backend.name == 'sqlite':
+            return self._collect_chunks(
+                ((chunk, functools.partial(_compute_chunk, *args, chunk))
+                    for chunk in chunks),
+                len(chunks))
+
+        options = {s: dict(config.items(s)) for s in config.sections()}
+        with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(options, transaction.database.name)) as executor:
+            futures = {
+                executor.submit(_compute_chunk, *args, chunk): chunk
+                for chunk in chunks}
+            return self._collect_chunks(
+                ((futures[f], f.result) for f in as_completed(futures)),
+                len(chunks))
+
+    @staticmethod
+    def _collect_chunks(results, total):
+        """
+        ნაწილების შედეგების შეჯამება და პროგრესის ლოგი.
+
+        results: [(ids, შედეგის ფუნქცია)]; ფუნქციის შეცდომა (მაგ.
+        გაჩერებული პროცესი) ნაწილის ყველა პეისლიპის შეცდომად ითვლება.
+        """
+        computed, errors = 0, []
+        for i, (chunk, result) in enumerate(results, 1):
+            try:
+                done, failed = result()
+            except Exception as exception:
+                logger.exception(
+                    "payroll run: chunk of %s payslips failed", len(chunk))
+                done = []
+                failed = [(payslip_id, str(exception)) for payslip_id in chunk]
+            computed += len(done)
+            errors.extend(failed)
+            logger.info(
+                "payroll run: %s/%s chunks, %s computed, %s failed",
+                i, total, computed, len(errors))
+        return computed, errors
@@ -1,10 +1,14 @@
 from trytond.pool import Pool
-from .income import IncomeDeclaration, IncomeDeclarationLine
+from .income import (
+    IncomeDeclaration, IncomeDeclarationLine, IncomeDeclarationReport,
+    IncomeDeclarationReportContext)
 
 
 def register():
     Pool.register(
         IncomeDeclaration,
         IncomeDeclarationLine,
+        IncomeDeclarationReport,
+        IncomeDeclarationReportContext,
         module='income_rs', type_='model'
     )
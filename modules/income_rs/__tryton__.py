@@ -6,6 +6,9 @@
     'depends': [
         'account',
         'company',
+        'ge_calendar',
+        'hr_payroll',
+        'party_ge_identifier',
     ],
     'xml': [
         'income_declaration.xml',
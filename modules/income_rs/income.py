@@ -1,7 +1,37 @@
-from decimal import Decimal
-from trytond.model import ModelSQL, ModelView, fields
+import datetime as dt
+import tempfile
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal
 
-__all__ = ['IncomeDeclaration', 'IncomeDeclarationLine']
+from sql import Column, Literal, Null
+from sql.aggregate import Count, Min, Sum
+from sql.conditionals import Coalesce
+from sql.functions import Round
+
+from trytond import backend
+from trytond.exceptions import UserError
+from trytond.model import Index, ModelSQL, ModelView, fields
+from trytond.modules.ge_calendar.profiling import profiled
+from trytond.pool import Pool
+from trytond.pyson import Eval, If
+from trytond.tools import grouped_slice, reduce_ids
+from trytond.transaction import Transaction
+
+from . import rs_xml
+
+# XML მეხსიერებაში ამ ზომამდე, შემდეგ – დროებით ფაილში
+SPOOL_SIZE = 1024 * 1024
+
+__all__ = [
+    'IncomeDeclaration', 'IncomeDeclarationLine',
+    'IncomeDeclarationReport', 'IncomeDeclarationReportContext']
+
+
+def _round(value):
+    """დამრგვალება 2 ათწილადზე (ველების digits=(16, 2))."""
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value or 0))
+    return value.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
 
 
 class IncomeDeclaration(ModelSQL, ModelView):
@@ -29,10 +59,59 @@ class IncomeDeclaration(ModelSQL, ModelView):
     rs_id = fields.Char("RS Declaration ID", readonly=True)
     rs_status = fields.Char("RS Status", readonly=True)
 
+    @classmethod
+    def __setup__(cls):
+        super().__setup__()
+        cls._buttons.update({
+                'generate': {
+                    'invisible': ~Eval('state').in_(['draft', 'computed']),
+                    'depends': ['state'],
+                    },
+                'compute': {
+                    'invisible': Eval('state') == 'sent',
+                    'depends': ['state'],
+                    },
+                'send_rs': {
+                    'invisible': Eval('state') != 'computed',
+                    'depends': ['state'],
+                    },
+                })
+
+    @classmethod
+    def __register__(cls, module_name):
+        pool = Pool()
+        Line = pool.get('ge.income.declaration.line')
+        super().__register__(module_name)
+        table = cls.__table__()
+        line = Line.__table__()
+        cursor = Transaction().connection.cursor()
+
+        # ჯამებს ხაზების create/write/delete ანახლებს; განახლებისას ყველა
+        # დეკლარაციის ჯამი ერთხელ თავიდან ითვლება (ძველი ჯამები
+        # on_change_lines-ით იყო შევსებული და შეიძლება მცდარი იყოს)
+        if not backend.TableHandler.table_exist(Line._table):
+            return
+
+        def total(column):
+            return Coalesce(line.select(
+                    Round(Sum(Coalesce(column, 0)), 2),
+                    where=line.declaration == table.id), 0)
+        cursor.execute(*table.update(
+                [table.total_amount, table.total_tax],
+                [total(line.amount), total(line.tax_amount)]))
+
     @staticmethod
     def default_state():
         return 'draft'
 
+    @staticmethod
+    def default_total_amount():
+        return Decimal('0.00')
+
+    @staticmethod
+    def default_total_tax():
+        return Decimal('0.00')
+
     @fields.depends('lines')
     def on_change_lines(self):
         total_amount = Decimal('0.00')
@@ -47,25 +126,207 @@ class IncomeDeclaration(ModelSQL, ModelView):
 
     @classmethod
     @ModelView.button
+    @profiled
     def compute(cls, declarations):
+        pool = Pool()
+        Line = pool.get('ge.income.declaration.line')
+
+        # გადასახადი ყველა ხაზზე მეხსიერებაში; ერთნაირი თანხის ხაზები
+        # ერთ write-ში, შეუცვლელი ხაზები არ იწერება
+        to_write = defaultdict(list)
         for decl in declarations:
-            # თითო ხაზზე მივითვლით გადასახადს
             for line in decl.lines:
-                line.calculate_tax()
-                line.save() # ხაზს ვინახავთ
-            
-            # გადავთვლით ჯამებს
-            decl.on_change_lines()
-            decl.state = 'computed'
-            decl.save()
+                tax_amount = line.on_change_with_tax_amount()
+                if tax_amount != line.tax_amount:
+                    to_write[tax_amount].append(line)
+        if to_write:
+            args = []
+            for tax_amount, lines in to_write.items():
+                args.extend([lines, {'tax_amount': tax_amount}])
+            Line.write(*args)
+
+        # ჯამებს Line.write თვითონ ანახლებს
+        if declarations:
+            cls.write(declarations, {'state': 'computed'})
+
+    @classmethod
+    @ModelView.button
+    @profiled
+    def generate(cls, declarations):
+        """
+        პერიოდიდან შევსება: დასრულებული (done) ხელფასის უწყისებიდან.
+
+        ერთი SQL მოთხოვნა თითო დეკლარაციაზე (payslip + employee party +
+        ge_pn identifier + account.move-ის თარიღი), ყველა ხაზი – ერთი
+        create-ით. ადრე გენერირებული ხაზები (payslip-ით) იცვლება,
+        ხელით შეყვანილი რჩება; სხვა დეკლარაციაში უკვე შეტანილი
+        payslip-ები გამოტოვებულია.
+        """
+        pool = Pool()
+        Line = pool.get('ge.income.declaration.line')
+
+        Line.delete(Line.search([
+                    ('declaration', 'in', [d.id for d in declarations]),
+                    ('payslip', '!=', None),
+                    ]))
+
+        to_create = []
+        missing = []
+        for decl in declarations:
+            for values in cls._payslip_lines(decl):
+                if not values['tin']:
+                    missing.append(' '.join(filter(None, [
+                                    values['first_name'],
+                                    values['last_name']])))
+                    continue
+                to_create.append(values)
+        if missing:
+            raise UserError(
+                'Employees without a Georgian Personal Number: '
+                + ', '.join(sorted(set(missing))[:20]))
+        if to_create:
+            Line.create(to_create)
+        cls.compute(declarations)
+
+    @classmethod
+    def _payslip_lines(cls, declaration):
+        "ხაზების მნიშვნელობები დეკლარაციის პერიოდის payslip-ებიდან"
+        pool = Pool()
+        Employee = pool.get('company.employee')
+        Identifier = pool.get('party.identifier')
+        Line = pool.get('ge.income.declaration.line')
+        Move = pool.get('account.move')
+        Party = pool.get('party.party')
+        Payslip = pool.get('hr.payslip')
+        PayrollRate = pool.get('hr.payroll.rate')
+
+        payslip = Payslip.__table__()
+        employee = Employee.__table__()
+        party = Party.__table__()
+        move = Move.__table__()
+        identifier = Identifier.__table__()
+        line = Line.__table__()
+        cursor = Transaction().connection.cursor()
+
+        # სხვა დეკლარაციის ხაზებში უკვე შეტანილი payslip-ები
+        declared = line.select(line.payslip,
+            where=(line.payslip != Null)
+            & (line.declaration != declaration.id))
+
+        # ერთ პარტნიორზე ერთი ge_pn, ნორმალიზებული ge_code-ით
+        personal_number = identifier.select(
+            identifier.party, Min(identifier.ge_code).as_('code'),
+            where=(identifier.type == 'ge_pn')
+            & (identifier.ge_code != Null)
+            & (identifier.active == Literal(True)),
+            group_by=identifier.party)
+
+        payment_date = Coalesce(move.date, payslip.date_to)
+        period = declaration.period
+        query = (payslip
+            .join(employee, condition=payslip.employee == employee.id)
+            .join(party, condition=employee.party == party.id)
+            .join(personal_number, 'LEFT',
+                condition=personal_number.party == party.id)
+            .join(move, 'LEFT', condition=payslip.move == move.id)
+            .select(
+                payslip.id, personal_number.code, party.name,
+                payslip.gross, payslip.pension_employee, payslip.income_tax,
+                payment_date,
+                where=(payslip.state == 'done')
+                & ~payslip.id.in_(declared)
+                & (payslip.company == declaration.company.id)
+                & (payment_date >= period.start_date)
+                & (payment_date <= period.end_date),
+                order_by=[party.name, payslip.id]))
+        cursor.execute(*query)
+        for (payslip_id, tin, name, gross, pension, tax,
+                date_) in cursor:
+            if not isinstance(date_, dt.date):
+                date_ = dt.date.fromisoformat(str(date_)[:10])
+            first_name, _, last_name = (name or '').partition(' ')
+            rates = PayrollRate.get_rates(date_)
+            yield {
+                'declaration': declaration.id,
+                'payslip': payslip_id,
+                'tin': tin,
+                'first_name': first_name or name,
+                'last_name': last_name or None,
+                'amount': _round(gross),
+                'other_relief': _round(pension),
+                'tax_rate': _round(rates.income_tax * 100),
+                'tax_amount': _round(tax),
+                'payment_date': date_,
+                }
 
     @classmethod
     @ModelView.button
+    @profiled
     def send_rs(cls, declarations):
+        """
+        XML ნაკადად დროებით ფაილში (დიდი ზომისას – დისკზე), შემდეგ
+        ატვირთვა RS-ზე ([income_rs] rs_url).
+        """
+        if not rs_xml.RS_URL:
+            raise UserError(
+                'The RS endpoint is not configured ([income_rs] rs_url).')
         for decl in declarations:
-            # აქ იქნება RS-ზე XML ატვირთვის ლოგიკა
-            decl.state = 'sent'
-            decl.save()
+            with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE) as fp:
+                writer = decl.export_xml(fp)
+                if writer.errors:
+                    raise UserError(
+                        f'Declaration "{decl.rec_name}" has invalid lines:\n'
+                        + '\n'.join(
+                            f'{row}: {", ".join(errors)}'
+                            for row, errors in writer.errors[:20]))
+                size = fp.tell()
+                fp.seek(0)
+                try:
+                    rs_id, rs_status = rs_xml.upload(fp, size)
+                except rs_xml.RSError as e:
+                    raise UserError(
+                        f'Upload of declaration "{decl.rec_name}" '
+                        f'to RS failed: {e}') from e
+            cls.write([decl], {
+                    'state': 'sent',
+                    'rs_id': rs_id,
+                    'rs_status': rs_status,
+                    })
+
+    def export_xml(self, fp):
+        """
+        დეკლარაციის XML-ის ჩაწერა fp-ში (ბინარული).
+
+        ხაზები იკითხება SQL-ით ნაწილ-ნაწილ; აბრუნებს DeclarationWriter-ს
+        (count, errors).
+        """
+        header = {
+            'company': self.company.rec_name,
+            'period': self.period.rec_name,
+            'start_date': self.period.start_date,
+            'end_date': self.period.end_date,
+            }
+        with rs_xml.DeclarationWriter(fp, header) as writer:
+            for values in self._rs_lines():
+                writer.write_line(values)
+        return writer
+
+    def _rs_lines(self):
+        "ხაზების dict-ები id-ის რიგით, fetchmany-ით"
+        pool = Pool()
+        Line = pool.get('ge.income.declaration.line')
+        line = Line.__table__()
+        cursor = Transaction().connection.cursor()
+        columns = [Column(line, name) for name in rs_xml.LINE_FIELDS]
+        cursor.execute(*line.select(*columns,
+                where=line.declaration == self.id,
+                order_by=line.id.asc))
+        while True:
+            rows = cursor.fetchmany(1000)
+            if not rows:
+                break
+            for row in rows:
+                yield dict(zip(rs_xml.LINE_FIELDS, row))
 
 
 class IncomeDeclarationLine(ModelSQL, ModelView):
@@ -75,6 +336,9 @@ class IncomeDeclarationLine(ModelSQL, ModelView):
     declaration = fields.Many2One(
         'ge.income.declaration', "Declaration",
         required=True, ondelete='CASCADE')
+    payslip = fields.Many2One(
+        'hr.payslip', "Payslip", readonly=True, ondelete='RESTRICT',
+        help="The payslip the line was generated from.")
 
     tin = fields.Char("პ/ნ ან საიდენტიფიკაციო", size=11, required=True)
     first_name = fields.Char("სახელი / სამართლებრივი ფორმა", required=True)
@@ -104,6 +368,86 @@ class IncomeDeclarationLine(ModelSQL, ModelView):
     tax_amount = fields.Numeric(
         "დაკავებული საშემოსავლო", digits=(16, 2))
 
+    @classmethod
+    def __setup__(cls):
+        super().__setup__()
+        t = cls.__table__()
+        # ანგარიშები: "TIN-ს გადახდილი წელს" და TIN დეკლარაციაში
+        cls._sql_indexes.update({
+                Index(t,
+                    (t.tin, Index.Equality()),
+                    (t.payment_date, Index.Range())),
+                Index(t,
+                    (t.declaration, Index.Equality()),
+                    (t.tin, Index.Equality())),
+                })
+
+    @classmethod
+    def create(cls, vlist):
+        lines = super().create(vlist)
+        cls._update_totals(lines, 1)
+        return lines
+
+    @classmethod
+    def write(cls, *args):
+        # ჯამები იცვლება მხოლოდ ამ ველებით
+        names = {'declaration', 'amount', 'tax_amount'}
+        actions = iter(args)
+        lines = []
+        for records, values in zip(actions, actions):
+            if names & values.keys():
+                lines.extend(records)
+        cls._update_totals(lines, -1)
+        super().write(*args)
+        cls._update_totals(lines, 1)
+
+    @classmethod
+    def delete(cls, lines):
+        cls._update_totals(lines, -1)
+        super().delete(lines)
+
+    @classmethod
+    def _update_totals(cls, lines, sign):
+        """
+        ხაზების თანხების დამატება (sign=1) ან გამოკლება (sign=-1)
+        დეკლარაციის total_amount/total_tax-ში, სხვა ხაზების წაკითხვის
+        გარეშე. დეკლარაციები იბლოკება, რომ პარალელური ცვლილება არ
+        დაიკარგოს.
+        """
+        pool = Pool()
+        Declaration = pool.get('ge.income.declaration')
+        line = cls.__table__()
+        cursor = Transaction().connection.cursor()
+
+        deltas = defaultdict(lambda: (Decimal(0), Decimal(0)))
+        for sub_ids in grouped_slice({l.id for l in lines}):
+            cursor.execute(*line.select(
+                    line.declaration,
+                    Sum(Coalesce(line.amount, 0)),
+                    Sum(Coalesce(line.tax_amount, 0)),
+                    where=reduce_ids(line.id, sub_ids),
+                    group_by=line.declaration))
+            for declaration_id, amount, tax in cursor:
+                total_amount, total_tax = deltas[declaration_id]
+                deltas[declaration_id] = (
+                    total_amount + sign * _round(amount),
+                    total_tax + sign * _round(tax))
+
+        declarations = Declaration.browse([
+                d for d, (amount, tax) in deltas.items() if amount or tax])
+        if not declarations:
+            return
+        Declaration.lock(declarations)
+        args = []
+        for declaration in declarations:
+            amount, tax = deltas[declaration.id]
+            args.extend([[declaration], {
+                        'total_amount': (
+                            (declaration.total_amount or 0) + amount),
+                        'total_tax': (declaration.total_tax or 0) + tax,
+                        }])
+        Declaration.write(*args)
+
     @staticmethod
     def default_residency_code():
         # 268 - საქართველო
@@ -133,7 +477,98 @@ class IncomeDeclarationLine(ModelSQL, ModelView):
         if final_tax < 0:
             final_tax = Decimal('0.00')
 
-        return final_tax
+        return _round(final_tax)
 
     def calculate_tax(self):
-        self.tax_amount = self.on_change_with_tax_amount()
\ No newline at end of file
+        self.tax_amount = self.on_change_with_tax_amount()
+
+
+class IncomeDeclarationReport(ModelSQL, ModelView):
+    "RS.GE Withholding per TIN"
+    __name__ = 'ge.income.declaration.report'
+
+    company = fields.Many2One('company.company', "Company", readonly=True)
+    period = fields.Many2One('account.period', "Period", readonly=True)
+    fiscalyear = fields.Many2One(
+        'account.fiscalyear', "Fiscal Year", readonly=True)
+    tin = fields.Char("პ/ნ ან საიდენტიფიკაციო", readonly=True)
+    payment_type = fields.Char("განაცემის სახე", readonly=True)
+    line_count = fields.Integer("ხაზები", readonly=True)
+    amount = fields.Numeric(
+        "განაცემი თანხა", digits=(16, 2), readonly=True)
+    tax_amount = fields.Numeric(
+        "დაკავებული საშემოსავლო", digits=(16, 2), readonly=True)
+
+    @classmethod
+    def __setup__(cls):
+        super().__setup__()
+        cls._order = [
+            ('tin', 'ASC'),
+            ('period', 'ASC'),
+            ('payment_type', 'ASC'),
+            ]
+
+    @classmethod
+    def table_query(cls):
+        """
+        ხაზების ჯამები TIN × პერიოდი × განაცემის სახე.
+
+        კონტექსტის from_date/to_date ფილტრავს payment_date-ს
+        (tin, payment_date) ინდექსით.
+        """
+        pool = Pool()
+        Declaration = pool.get('ge.income.declaration')
+        Line = pool.get('ge.income.declaration.line')
+        Period = pool.get('account.period')
+        line = Line.__table__()
+        declaration = Declaration.__table__()
+        period = Period.__table__()
+        context = Transaction().context
+
+        where = Literal(True)
+        if context.get('company'):
+            where &= declaration.company == context['company']
+        if context.get('from_date'):
+            where &= line.payment_date >= context['from_date']
+        if context.get('to_date'):
+            where &= line.payment_date <= context['to_date']
+
+        return (line
+            .join(declaration, condition=line.declaration == declaration.id)
+            .join(period, condition=declaration.period == period.id)
+            .select(
+                Min(line.id).as_('id'),
+                declaration.company.as_('company'),
+                declaration.period.as_('period'),
+                period.fiscalyear.as_('fiscalyear'),
+                line.tin.as_('tin'),
+                line.payment_type.as_('payment_type'),
+                Count(Literal('*')).as_('line_count'),
+                Sum(Coalesce(line.amount, 0)).as_('amount'),
+                Sum(Coalesce(line.tax_amount, 0)).as_('tax_amount'),
+                where=where,
+                group_by=[
+                    declaration.company, declaration.period,
+                    period.fiscalyear, line.tin, line.payment_type,
+                    ]))
+
+    def get_rec_name(self, name):
+        return self.tin
+
+
+class IncomeDeclarationReportContext(ModelView):
+    "RS.GE Withholding per TIN Context"
+    __name__ = 'ge.income.declaration.report.context'
+
+    company = fields.Many2One('company.company', "Company")
+    from_date = fields.Date("From Date",
+        domain=[
+            If(Eval('to_date') & Eval('from_date'),
+                ('from_date', '<=', Eval('to_date')),
+                ()),
+            ])
+    to_date = fields.Date("To Date")
+
+    @classmethod
+    def default_company(cls):
+        return Transaction().context.get('company')
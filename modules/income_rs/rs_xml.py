@@ -0,0 +1,154 @@
+"""
+RS.ge-ის დეკლარაციის XML – ნაკადად ჩაწერა და ატვირთვა.
+
+XML იწერება XMLGenerator-ით სტრიქონ-სტრიქონ (DOM-ის გარეშე), ამიტომ
+მეხსიერება ხაზების რაოდენობაზე არ არის დამოკიდებული. ყოველი ხაზი
+მოწმდება RS-ის ველების ზომებზე.
+
+    [income_rs]
+    rs_url = http://localhost:8081/declarations
+    rs_timeout = 60
+"""
+import json
+import ssl
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+from xml.sax.saxutils import XMLGenerator
+
+from trytond.config import config
+
+RS_URL = config.get('income_rs', 'rs_url', default=None)
+RS_TIMEOUT = config.getint('income_rs', 'rs_timeout', default=60)
+
+# ხაზის ველები XML-ის რიგით
+LINE_FIELDS = [
+    'tin', 'first_name', 'last_name', 'address', 'residency_code',
+    'recipient_category', 'payment_type', 'amount', 'other_relief',
+    'payment_date', 'tax_rate', 'treaty_exempt_tax', 'foreign_tax_credit',
+    'tax_amount',
+    ]
+
+# RS-ის ველების ზომები: (მინიმუმი, მაქსიმუმი)
+FIELD_SIZES = {
+    'tin': (11, 11),
+    'residency_code': (3, 3),
+    'recipient_category': (2, 2),
+    'payment_type': (2, 2),
+    }
+
+REQUIRED = ('tin', 'first_name', 'amount', 'payment_date', 'tax_rate')
+
+
+class RSError(Exception):
+    pass
+
+
+def validate_line(values):
+    """ხაზის შემოწმება; აბრუნებს შეცდომების ტექსტების სიას."""
+    errors = []
+    for name in REQUIRED:
+        if values.get(name) in (None, ''):
+            errors.append(f'"{name}" is required')
+    for name, (minimum, maximum) in FIELD_SIZES.items():
+        value = values.get(name)
+        if value in (None, ''):
+            continue
+        value = str(value)
+        if not minimum <= len(value) <= maximum:
+            size = minimum if minimum == maximum else f'{minimum}-{maximum}'
+            errors.append(
+                f'"{name}" must be {size} characters long, not "{value}"')
+        elif name == 'tin' and not value.isdigit():
+            errors.append(f'"tin" must contain digits only, not "{value}"')
+    return errors
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+class DeclarationWriter:
+    """
+    XML-ის ნაკადად ჩამწერი:
+
+        with DeclarationWriter(fp, header) as writer:
+            for values in rows:
+                writer.write_line(values)
+
+    ხაზი, რომელიც ვერ გაივლის validate_line-ს, errors-ში იწერება
+    (row – 1-დან) და XML-ში არ ხვდება.
+    """
+
+    def __init__(self, fp, header):
+        self.fp = fp
+        self.header = header
+        self.count = 0
+        self.errors = []
+        self._xml = XMLGenerator(fp, 'utf-8', short_empty_elements=True)
+
+    def __enter__(self):
+        xml = self._xml
+        xml.startDocument()
+        xml.startElement('Declaration', {
+                k: _text(v) for k, v in self.header.items()})
+        xml.ignorableWhitespace('\n')
+        return self
+
+    def write_line(self, values):
+        row = self.count + len(self.errors) + 1
+        errors = validate_line(values)
+        if errors:
+            self.errors.append((row, errors))
+            return
+        xml = self._xml
+        xml.startElement('Line', {})
+        for name in LINE_FIELDS:
+            value = values.get(name)
+            if value is None:
+                continue
+            xml.startElement(name, {})
+            xml.characters(_text(value))
+            xml.endElement(name)
+        xml.endElement('Line')
+        xml.ignorableWhitespace('\n')
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self._xml.endElement('Declaration')
+            self._xml.endDocument()
+        return False
+
+
+def upload(fp, size, url=None, timeout=None):
+    """
+    XML-ის ატვირთვა RS-ზე ნაკადად (fp – ფაილი თავიდან).
+
+    აბრუნებს (rs_id, rs_status) JSON პასუხიდან.
+    """
+    url = url or RS_URL
+    if not url:
+        raise RSError("The RS endpoint is not configured")
+    request = Request(url, data=fp, method='POST', headers={
+            'Content-Type': 'application/xml; charset=utf-8',
+            'Content-Length': str(size),
+            'User-Agent': 'Tryton income_rs',
+            })
+    context = ssl.create_default_context() \
+        if url.startswith('https') else None
+    try:
+        with urlopen(
+                request, context=context,
+                timeout=timeout or RS_TIMEOUT) as response:
+            body = json.load(response)
+    except HTTPError as e:
+        raise RSError(f"RS answered {e.code}") from e
+    except (URLError, TimeoutError, OSError, ValueError) as e:
+        raise RSError(str(e)) from e
+    if not isinstance(body, dict):
+        raise RSError(f"Unexpected RS answer: {body!r:.200}")
+    return body.get('id'), body.get('status')
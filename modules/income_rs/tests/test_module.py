@@ -0,0 +1,201 @@
+import datetime as dt
+import json
+import threading
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from unittest.mock import patch
+from xml.etree import ElementTree
+
+from trytond.exceptions import UserError
+from trytond.model.exceptions import ForeignKeyError
+from trytond.modules.account.tests import get_fiscalyear
+from trytond.modules.company.tests import create_company, set_company
+from trytond.modules.hr_payroll.benchmark import create_company_data
+from trytond.modules.income_rs import rs_xml
+from trytond.pool import Pool
+from trytond.tests.test_tryton import ModuleTestCase, with_transaction
+
+
+def personal_number(i):
+    "Mod 11-ით სწორი პირადი ნომერი"
+    base = '%010d' % i
+    remainder = sum(
+        int(c) * w for c, w in zip(base, range(1, 11))) % 11
+    return base + ('0' if remainder == 10 else str(remainder))
+
+
+class RSHandler(BaseHTTPRequestHandler):
+    "RS-ის შემცვლელი: იმახსოვრებს POST-ის სხეულს, პასუხობს answer-ით"
+    requests = []
+    answer = {'id': 'RS-1', 'status': 'accepted'}
+
+    def do_POST(self):
+        size = int(self.headers['Content-Length'])
+        self.requests.append(self.rfile.read(size))
+        body = json.dumps(self.answer).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class IncomeRSTestCase(ModuleTestCase):
+    "Test Income RS module"
+    module = 'income_rs'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), RSHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = 'http://127.0.0.1:%s/declarations' % cls.server.server_port
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        RSHandler.requests.clear()
+        RSHandler.answer = {'id': 'RS-1', 'status': 'accepted'}
+
+    def create_declaration(self, company, lines=3):
+        pool = Pool()
+        Declaration = pool.get('ge.income.declaration')
+        FiscalYear = pool.get('account.fiscalyear')
+
+        fiscalyear = get_fiscalyear(company, today=dt.date(2025, 1, 1))
+        fiscalyear.save()
+        FiscalYear.create_period([fiscalyear])
+        declaration, = Declaration.create([{
+                    'company': company.id,
+                    'period': fiscalyear.periods[0].id,
+                    'lines': [('create', [{
+                                    'tin': '%011d' % i,
+                                    'first_name': "Name %s" % i,
+                                    'amount': Decimal('1000.00'),
+                                    'payment_date': dt.date(2025, 1, 15),
+                                    } for i in range(lines)])],
+                    }])
+        Declaration.compute([declaration])
+        return declaration
+
+    def test_upload(self):
+        "Test upload to the RS endpoint"
+        data = b'<Declaration/>'
+        self.assertEqual(
+            rs_xml.upload(BytesIO(data), len(data), url=self.url),
+            ('RS-1', 'accepted'))
+        self.assertEqual(RSHandler.requests, [data])
+
+    def test_upload_unexpected_answer(self):
+        "Test upload with an answer that is not an object"
+        RSHandler.answer = ['RS-1']
+        with self.assertRaises(rs_xml.RSError):
+            rs_xml.upload(BytesIO(b'<Declaration/>'), 14, url=self.url)
+
+    def test_validate_line(self):
+        "Test line validation against RS field sizes"
+        values = {
+            'tin': '0100101101', 'first_name': "Name",
+            'amount': Decimal('10.00'), 'payment_date': dt.date(2025, 1, 1),
+            'tax_rate': Decimal('20.00'), 'residency_code': '268',
+            }
+        self.assertEqual(len(rs_xml.validate_line(values)), 1)
+        values['tin'] = '01001011013'
+        self.assertEqual(rs_xml.validate_line(values), [])
+
+    @with_transaction()
+    def test_send_rs(self):
+        "Test send_rs streams the declaration to RS"
+        company = create_company()
+        with set_company(company):
+            declaration = self.create_declaration(company)
+            with patch.object(rs_xml, 'RS_URL', self.url):
+                declaration.send_rs([declaration])
+
+            self.assertEqual(declaration.state, 'sent')
+            self.assertEqual(declaration.rs_id, 'RS-1')
+            self.assertEqual(declaration.rs_status, 'accepted')
+            request, = RSHandler.requests
+            root = ElementTree.fromstring(request)
+            self.assertEqual(len(root.findall('Line')), 3)
+            self.assertEqual(root.find('Line/tin').text, '00000000000')
+
+    @with_transaction()
+    def test_send_rs_without_endpoint(self):
+        "Test send_rs without a configured endpoint"
+        company = create_company()
+        with set_company(company):
+            declaration = self.create_declaration(company)
+            with patch.object(rs_xml, 'RS_URL', None):
+                with self.assertRaises(UserError):
+                    declaration.send_rs([declaration])
+
+            self.assertEqual(declaration.state, 'computed')
+            self.assertEqual(RSHandler.requests, [])
+
+    @with_transaction()
+    def test_generate_again(self):
+        "Test generate replaces its lines and skips declared payslips"
+        pool = Pool()
+        Contract = pool.get('hr.contract')
+        Date = pool.get('ir.date')
+        Declaration = pool.get('ge.income.declaration')
+        Identifier = pool.get('party.identifier')
+        Payslip = pool.get('hr.payslip')
+        Period = pool.get('account.period')
+
+        # complete() ატარებს გატარებას დღევანდელ პერიოდში
+        today = Date.today()
+        company = create_company_data(3, today.year)
+        with set_company(company):
+            contracts = Contract.search([])
+            Identifier.create([{
+                        'party': c.employee.party.id,
+                        'type': 'ge_pn',
+                        'code': personal_number(10 ** 9 + i),
+                        } for i, c in enumerate(contracts)])
+            payslips = Payslip.create([{
+                        'company': company.id,
+                        'employee': c.employee.id,
+                        'contract': c.id,
+                        'date_from': today.replace(day=1),
+                        'date_to': today.replace(day=28),
+                        'currency': c.currency.id,
+                        } for c in contracts])
+            Payslip.compute(payslips)
+            Payslip.complete(payslips)
+            period, = Period.search([
+                    ('start_date', '<=', today),
+                    ('end_date', '>=', today),
+                    ('type', '=', 'standard'),
+                    ])
+            declaration, other = Declaration.create([{
+                        'company': company.id,
+                        'period': period.id,
+                        }] * 2)
+
+            Declaration.generate([declaration])
+            Declaration.generate([declaration])
+            Declaration.generate([other])
+
+            self.assertEqual(len(declaration.lines), len(payslips))
+            self.assertEqual(
+                {l.payslip for l in declaration.lines}, set(payslips))
+            self.assertEqual(
+                declaration.total_amount, sum(p.gross for p in payslips))
+            self.assertEqual(other.lines, ())
+
+            with self.assertRaises(ForeignKeyError):
+                Payslip.delete(payslips[:1])
+
+
+del ModuleTestCase
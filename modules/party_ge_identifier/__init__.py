@@ -1,9 +1,18 @@
 from trytond.pool import Pool
-from . import party
+from . import party, revalidation
 
 
 def register():
     Pool.register(
         party.Identifier,
+        party.IdentifierImportStart,
+        party.IdentifierImportResult,
+        revalidation.Finding,
+        revalidation.Revalidation,
+        revalidation.Cron,
         module='party_ge_identifier', type_='model'
     )
+    Pool.register(
+        party.IdentifierImport,
+        module='party_ge_identifier', type_='wizard'
+    )
@@ -5,5 +5,8 @@ info = {
         'party',
         'party_stdnum',  # ვამატებთ, რომ ჩვენი მოდული stdnum-ის შემდეგ ჩაიტვირთოს
     ],
-    'xml': [],
+    'xml': [
+        'message.xml',
+        'party.xml',
+    ],
 }
@@ -0,0 +1,82 @@
+"""
+Mod 11 შემოწმების ბენჩმარკი.
+
+ადარებს ძველ შემოწმებას (int-ების სია + წონების ციკლი ყოველ კოდზე),
+checksum.is_valid-ს და checksum.validate_batch-ს (NumPy, თუ
+დაყენებულია) შემთხვევით 11-ნიშნა კოდებზე.
+
+გამოყენება:
+    python -m trytond.modules.party_ge_identifier.benchmark \\
+        --sizes 100000 1000000 --output mod11-benchmark.json
+"""
+import argparse
+import datetime as dt
+import json
+import random
+import time
+
+from trytond.modules.party_ge_identifier import checksum
+
+
+def legacy_mod11(code_str):
+    "ძველი Identifier._validate_mod11"
+    if len(code_str) != 11 or not code_str.isdigit():
+        return False
+    digits = [int(ch) for ch in code_str]
+    weights = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+    checksum_sum = 0
+    for i in range(10):
+        checksum_sum += digits[i] * weights[i]
+    remainder = checksum_sum % 11
+    check_digit = digits[10]
+    if remainder == 10:
+        return check_digit == 0
+    return remainder == check_digit
+
+
+def create_codes(size, seed=0):
+    rng = random.Random(seed)
+    return ['%011d' % rng.randrange(10 ** 11) for _ in range(size)]
+
+
+def measure(func, codes):
+    start = time.perf_counter()
+    result = func(codes)
+    return time.perf_counter() - start, result
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        '--sizes', nargs='+', type=int, default=[100000, 1000000])
+    parser.add_argument('--output', default='mod11-benchmark.json')
+    options = parser.parse_args(args)
+
+    results = []
+    for size in options.sizes:
+        codes = create_codes(size)
+        legacy, expected = measure(
+            lambda c: [legacy_mod11(x) for x in c], codes)
+        single, result_single = measure(
+            lambda c: [checksum.is_valid(x) for x in c], codes)
+        batch, result_batch = measure(checksum.validate_batch, codes)
+        assert result_single == expected and result_batch == expected
+        result = {
+            'size': size,
+            'numpy': checksum.numpy is not None,
+            'legacy': round(legacy, 4),
+            'is_valid': round(single, 4),
+            'validate_batch': round(batch, 4),
+            }
+        results.append(result)
+        print(json.dumps(result))
+
+    with open(options.output, 'w') as fp:
+        json.dump({
+            'date': dt.datetime.now().isoformat(),
+            'results': results,
+            }, fp, indent=2)
+
+
+if __name__ == '__main__':
+    main()
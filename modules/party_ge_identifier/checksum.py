@@ -0,0 +1,120 @@
+"""
+Mod 11 საკონტროლო ციფრი ქართული იდენტიფიკატორებისთვის.
+
+წონები ტიპის მიხედვით; trytond.conf-ში შეიძლება გადაიფაროს:
+
+    [party_ge_identifier]
+    ge_pn_weights = 1,2,3,4,5,6,7,8,9,10
+    ge_tax_weights = 1,2,3,4,5,6,7,8,9,10
+
+is_valid – ერთი კოდი (ცხრილით, int()-ების სიის გარეშე);
+validate_batch – კოდების სვეტი ერთ გავლაში (NumPy-ით, თუ დაყენებულია).
+"""
+import hashlib
+
+from trytond.config import config
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+LENGTH = 11
+
+# Placeholder წონები – მერე შეცვლი, თუ ზუსტ ფორმულას გაარკვევ
+DEFAULT_WEIGHTS = (1, 2, 3, 4, 5, 6, 7, 8, 9, 10)
+
+
+def _weights(type_):
+    value = config.get('party_ge_identifier', f'{type_}_weights')
+    if not value:
+        return DEFAULT_WEIGHTS
+    weights = tuple(int(w) for w in value.split(','))
+    if len(weights) != LENGTH - 1:
+        raise ValueError(
+            f"[party_ge_identifier] {type_}_weights needs {LENGTH - 1} "
+            f"weights, got {len(weights)}")
+    return weights
+
+
+WEIGHTS = {
+    'ge_pn': _weights('ge_pn'),
+    'ge_tax': _weights('ge_tax'),
+    }
+
+
+def _tables(weights):
+    # პოზიცია → {სიმბოლო: ციფრი × წონა}; არა-ციფრი ცხრილში არ არის
+    return tuple(
+        {str(d): d * w for d in range(10)} for w in weights)
+
+
+_TABLES = {type_: _tables(w) for type_, w in WEIGHTS.items()}
+_CHECK = {str(d): d for d in range(10)}
+
+
+def rules_version():
+    """წესების (წონების) ანაბეჭდი – იცვლება წონების შეცვლისას."""
+    return hashlib.sha1(
+        repr(sorted(WEIGHTS.items())).encode()).hexdigest()[:12]
+
+
+def is_valid(code, type_='ge_pn'):
+    """
+    Modulus 11: Σ ციფრი × წონა (პირველი 10) mod 11 = ბოლო ციფრი;
+    ნაშთი 10 – მხოლოდ საკონტროლო 0-ით.
+    """
+    if len(code) != LENGTH:
+        return False
+    try:
+        remainder = sum(
+            table[ch] for table, ch in zip(_TABLES[type_], code)) % 11
+        check_digit = _CHECK[code[10]]
+    except KeyError:
+        return False
+    if remainder == 10:
+        return check_digit == 0
+    return remainder == check_digit
+
+
+def validate_digits(digits, type_='ge_pn'):
+    """
+    NumPy ციფრების მატრიცა (n × 11) → bool მასივი.
+
+    ციფრის გარეთა მნიშვნელობის მქონე სტრიქონი არასწორია.
+    """
+    digits = numpy.asarray(digits)
+    ok = ((digits >= 0) & (digits <= 9)).all(axis=1)
+    weights = numpy.array(WEIGHTS[type_], dtype=numpy.int64)
+    remainder = (digits[:, :LENGTH - 1].astype(numpy.int64) @ weights) % 11
+    check_digit = digits[:, LENGTH - 1]
+    return ok & numpy.where(
+        remainder == 10, check_digit == 0, remainder == check_digit)
+
+
+def validate_batch(codes, type_='ge_pn'):
+    """
+    კოდების სია → bool-ების სია, იმავე რიგით.
+
+    NumPy-ით ყველა კოდი ერთ მატრიცად იკითხება; მის გარეშე – is_valid.
+    """
+    if numpy is None or not codes:
+        return [is_valid(code, type_) for code in codes]
+
+    size = len(codes)
+    padding = '\0' * LENGTH
+    lengths = numpy.fromiter(map(len, codes), dtype=numpy.intp, count=size)
+    ok = lengths == LENGTH
+    if not ok.all():
+        codes = [
+            c if length == LENGTH else padding
+            for c, length in zip(codes, lengths.tolist())]
+    try:
+        buffer = ''.join(codes).encode('ascii')
+    except UnicodeEncodeError:
+        codes = [c if c.isascii() else padding for c in codes]
+        buffer = ''.join(codes).encode('ascii')
+    # uint8-ზე '0'-ზე ნაკლები სიმბოლო 9-ზე დიდ რიცხვად იქცევა
+    digits = (numpy.frombuffer(buffer, dtype=numpy.uint8)
+        .reshape(size, LENGTH) - ord('0'))
+    return (ok & validate_digits(digits, type_)).tolist()
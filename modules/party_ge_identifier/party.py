@@ -1,8 +1,24 @@
-from trytond.model import fields
-from trytond.pool import PoolMeta
+import csv
+import io
+import logging
+from collections import defaultdict
+
+from sql import Literal, Null
+
+from trytond.model import Index, ModelView, Unique, fields
+from trytond.pool import Pool, PoolMeta
 from trytond.exceptions import UserError
+from trytond.tools import grouped_slice, reduce_ids
+from trytond.transaction import Transaction
+from trytond.wizard import Button, StateTransition, StateView, Wizard
+
+from . import validation
 
-__all__ = ['Identifier']
+__all__ = [
+    'Identifier', 'IdentifierImportStart', 'IdentifierImportResult',
+    'IdentifierImport']
+
+logger = logging.getLogger(__name__)
 
 
 class Identifier(metaclass=PoolMeta):
@@ -16,6 +32,10 @@ class Identifier(metaclass=PoolMeta):
     """
     __name__ = 'party.identifier'
 
+    ge_code = fields.Char(
+        "Georgian Code", readonly=True,
+        help="Normalized ge_tax / ge_pn code used for lookups.")
+
     @classmethod
     def __setup__(cls):
         """
@@ -24,6 +44,18 @@ class Identifier(metaclass=PoolMeta):
         """
         super().__setup__()
 
+        # ერთი ge_code ერთხელ თითო ტიპზე (NULL – სხვა ტიპები)
+        t = cls.__table__()
+        cls._sql_constraints += [
+            ('ge_code_uniq', Unique(t, t.ge_code, t.type),
+                'party_ge_identifier.msg_ge_code_unique'),
+            ]
+        cls._sql_indexes.add(
+            Index(t,
+                (t.ge_code, Index.Equality()),
+                (t.type, Index.Equality()),
+                where=t.ge_code != Null))
+
         extra_types = [
             ('ge_tax', 'Georgian Tax ID'),
             ('ge_pn', 'Georgian Personal Number'),
@@ -55,31 +87,97 @@ class Identifier(metaclass=PoolMeta):
                 if key not in existing:
                     selection.append((key, label))
 
-    @staticmethod
-    def _validate_mod11(code_str: str) -> bool:
-        """
-        Modulus 11 ალგორითმი 11-ნიშნა პირადი ნომრებისთვის.
-        """
-        if len(code_str) != 11 or not code_str.isdigit():
-            return False
-
-        digits = [int(ch) for ch in code_str]
+    @classmethod
+    def __register__(cls, module_name):
+        super().__register__(module_name)
+        cls._fill_ge_code()
 
-        # Placeholder წონები – მერე შეცვლი, თუ ზუსტ ფორმულას გაარკვევ
-        weights = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+    @classmethod
+    def _fill_ge_code(cls):
+        """
+        ge_code-ის შევსება არსებული ჩანაწერებისთვის (მიგრაცია).
 
-        checksum_sum = 0
-        for i in range(10):
-            checksum_sum += digits[i] * weights[i]
+        დუბლიკატი ცარიელი რჩება და ლოგში იწერება – მისი გასწორება
+        ხელით უნდა მოხდეს.
+        """
+        cursor = Transaction().connection.cursor()
+        table = cls.__table__()
+
+        cursor.execute(*table.select(
+                table.id, table.type, table.ge_code,
+                where=table.type.in_(validation.GE_TYPES)
+                & (table.ge_code != Null)))
+        used = {(type_, code) for _, type_, code in cursor}
+
+        cursor.execute(*table.select(
+                table.id, table.type, table.code,
+                where=table.type.in_(validation.GE_TYPES)
+                & (table.ge_code == Null),
+                order_by=table.id))
+        values = defaultdict(list)
+        for id_, type_, code in cursor.fetchall():
+            ge_code = validation.normalize(code)
+            if not ge_code:
+                continue
+            if (type_, ge_code) in used:
+                logger.warning(
+                    "Duplicate %s identifier %s (id %s) left without "
+                    "ge_code", type_, ge_code, id_)
+                continue
+            used.add((type_, ge_code))
+            values[ge_code].append(id_)
+        for ge_code, ids in values.items():
+            cursor.execute(*table.update(
+                    [table.ge_code], [ge_code],
+                    where=reduce_ids(table.id, ids)))
+
+    def compute_fields(self, field_names=None):
+        values = super().compute_fields(field_names=field_names)
+        if field_names is None or {'code', 'type'} & field_names:
+            type_ = getattr(self, 'type', None)
+            ge_code = validation.normalize(getattr(self, 'code', None)) \
+                if type_ in validation.GE_TYPES else None
+            if getattr(self, 'ge_code', None) != ge_code:
+                values['ge_code'] = ge_code
+        return values
 
-        remainder = checksum_sum % 11
-        check_digit = digits[10]
+    @classmethod
+    def search_by_ge_code(cls, codes, types=None):
+        """
+        ge_tax / ge_pn კოდით პარტნიორების მოძებნა ინდექსით.
 
-        if remainder == 10:
-            # უსაფრთხო ვარიანტი: მხოლოდ მაშინ გავატაროთ, თუ check_digit == 0
-            return check_digit == 0
+        codes: ერთი კოდი ან სია (ნებისმიერი ფორმატით – ნორმალიზდება).
+        აბრუნებს {ge_code: party id}; ერთ კოდზე რამდენიმე ტიპის
+        დამთხვევისას უპირატესობა types-ის რიგს აქვს.
+        """
+        if types is None:
+            types = validation.GE_TYPES
+        if isinstance(codes, str):
+            codes = [codes]
+        ge_codes = {c for c in map(validation.normalize, codes) if c}
+        priority = {t: i for i, t in enumerate(types)}
+
+        cursor = Transaction().connection.cursor()
+        table = cls.__table__()
+        result, found = {}, {}
+        for sub_codes in grouped_slice(ge_codes):
+            cursor.execute(*table.select(
+                    table.ge_code, table.type, table.party,
+                    where=table.ge_code.in_(list(sub_codes))
+                    & table.type.in_(list(types))
+                    & (table.active == Literal(True))))
+            for ge_code, type_, party in cursor:
+                if priority[type_] < found.get(ge_code, len(types)):
+                    found[ge_code] = priority[type_]
+                    result[ge_code] = party
+        return result
 
-        return remainder == check_digit
+    @staticmethod
+    def _validate_mod11(code_str: str) -> bool:
+        """
+        Modulus 11 ალგორითმი 11-ნიშნა პირადი ნომრებისთვის.
+        """
+        return validation.validate_mod11(code_str)
 
     @fields.depends('type', 'code', 'party')
     def check_code(self):
@@ -87,7 +185,7 @@ class Identifier(metaclass=PoolMeta):
         ვაფართოებთ სტანდარტულ check_code-ს:
 
         - ჯერ core-ის check_code (stdnum და სხვ.)
-        - შემდეგ ჩვენი ქართული ლოგიკა:
+        - შემდეგ ჩვენი ქართული ლოგიკა (validation.check):
 
           ge_tax:
             - 9 ციფრი  -> მხოლოდ სიგრძე + ციფრები (legacy / modern), checksum არა
@@ -105,64 +203,177 @@ class Identifier(metaclass=PoolMeta):
         if not code or not type_:
             return
 
-        party_name = self.party.rec_name if self.party else ''
-
-        # -----------------------------
-        # Georgian Tax ID (9 ან 11 ციფრი)
-        # -----------------------------
-        if type_ == 'ge_tax':
-            if not code.isdigit():
-                msg = (
-                    f'The Georgian Tax ID "{code}" for party "{party_name}" '
-                    f'must contain digits only.'
-                )
-                raise UserError(msg)
-
-            length = len(code)
-
-            if length == 9:
-                # 9-ნიშნა: ჰიბრიდული რეჟიმი, checksum არ ვიყენებთ.
-                # Legacy (მაგ: 245...) + modern (4xx...) კოდები.
-                # რეალური ვალიდაცია მაინც RS.ge / NAPR ბაზაში უნდა მოხდეს.
-                return
-
-            if length == 11:
-                # 11-ნიშნა: ინდ. მეწარმე – პირადი ნომერი, Mod 11
-                if not self._validate_mod11(code):
-                    msg = (
-                        f'The Georgian Tax ID "{code}" for party "{party_name}" '
-                        f'is 11 digits long but fails the Mod 11 checksum.'
-                    )
-                    raise UserError(msg)
-                return
-
-            msg = (
-                f'The Georgian Tax ID "{code}" for party "{party_name}" '
-                f'must be 9 or 11 digits long.'
-            )
-            raise UserError(msg)
-
-        # -----------------------------
-        # Georgian Personal Number (11 ციფრი, მკაცრად)
-        # -----------------------------
-        if type_ == 'ge_pn':
-            if not code.isdigit():
-                msg = (
-                    f'The Georgian Personal Number "{code}" for party "{party_name}" '
-                    f'must contain digits only.'
-                )
-                raise UserError(msg)
-
-            if len(code) != 11:
-                msg = (
-                    f'The Georgian Personal Number "{code}" for party "{party_name}" '
-                    f'must be exactly 11 digits long.'
-                )
-                raise UserError(msg)
-
-            if not self._validate_mod11(code):
-                msg = (
-                    f'The Georgian Personal Number "{code}" for party "{party_name}" '
-                    f'is not valid (Mod 11 checksum failed).'
-                )
-                raise UserError(msg)
+        error = validation.check(type_, code)
+        if error:
+            # პარტნიორის სახელი მხოლოდ შეცდომისას
+            party_name = self.party.rec_name if self.party else ''
+            raise UserError(validation.MESSAGES[error].format(
+                code=code, type=type_, party=party_name))
+
+    @classmethod
+    def import_rows(cls, rows):
+        """
+        ბევრი (party id, type, code) ერთად: ვალიდაცია ORM-ის გარეშე,
+        სწორების შექმნა ერთი create-ით.
+
+        აბრუნებს (identifiers, report); report – შეცდომების სია
+        dict-ებად: row, party, type, code, error, message. პარტნიორის
+        სახელი მხოლოდ შეცდომიანი სტრიქონებისთვის იკითხება.
+        """
+        pool = Pool()
+        Party = pool.get('party.party')
+
+        valid, errors = validation.validate_rows(rows)
+
+        party_ids = {p for _, p, _, _ in valid if isinstance(p, int)}
+        existing_parties = set()
+        for sub_ids in grouped_slice(party_ids):
+            existing_parties.update(
+                p.id for p in Party.search([('id', 'in', list(sub_ids))]))
+
+        # ge_code უნიკალურია ტიპზე (იხ. ge_code_uniq)
+        existing = set()
+        for sub_codes in grouped_slice(
+                {validation.normalize(c) for _, _, _, c in valid}):
+            existing.update(
+                (i.type, i.ge_code) for i in cls.search([
+                        ('ge_code', 'in', list(sub_codes)),
+                        ('type', 'in', validation.GE_TYPES),
+                        ]))
+
+        to_create = []
+        for row, party, type_, code in valid:
+            key = (type_, validation.normalize(code))
+            if party not in existing_parties:
+                errors.append(
+                    validation.RowError(row, party, type_, code, 'party'))
+            elif key in existing:
+                errors.append(validation.RowError(
+                        row, party, type_, code, 'duplicate'))
+            else:
+                existing.add(key)
+                to_create.append({
+                        'party': party,
+                        'type': type_,
+                        'code': code,
+                        'ge_code': key[1],
+                        })
+        identifiers = cls.create(to_create) if to_create else []
+
+        names = {}
+        error_parties = {
+            e.party for e in errors
+            if isinstance(e.party, int) and e.error != 'party'}
+        for sub_ids in grouped_slice(error_parties):
+            names.update(
+                (p.id, p.rec_name) for p in Party.browse(list(sub_ids)))
+
+        report = []
+        for error in sorted(errors, key=lambda e: e.row):
+            party = names.get(error.party, error.party)
+            report.append({
+                    'row': error.row,
+                    'party': error.party,
+                    'type': error.type,
+                    'code': error.code,
+                    'error': error.error,
+                    'message': validation.MESSAGES[error.error].format(
+                        code=error.code, type=error.type,
+                        party=party if party is not None else ''),
+                    })
+        return identifiers, report
+
+
+class IdentifierImportStart(ModelView):
+    "Import Georgian Identifiers"
+    __name__ = 'party.identifier.import.start'
+
+    data = fields.Binary(
+        "File", required=True, filename='filename',
+        help="CSV with the columns: party code, type (ge_tax / ge_pn), "
+        "identifier code.")
+    filename = fields.Char("File Name")
+    header = fields.Boolean("Header", help="Skip the first row.")
+    delimiter = fields.Char("Delimiter", size=1, required=True)
+
+    @staticmethod
+    def default_header():
+        return True
+
+    @staticmethod
+    def default_delimiter():
+        return ','
+
+
+class IdentifierImportResult(ModelView):
+    "Import Georgian Identifiers"
+    __name__ = 'party.identifier.import.result'
+
+    created = fields.Integer("Created", readonly=True)
+    errors = fields.Integer("Errors", readonly=True)
+    report = fields.Text("Report", readonly=True)
+
+
+class IdentifierImport(Wizard):
+    "Import Georgian Identifiers"
+    __name__ = 'party.identifier.import'
+
+    start = StateView(
+        'party.identifier.import.start',
+        'party_ge_identifier.identifier_import_start_view_form', [
+            Button("Cancel", 'end', 'tryton-cancel'),
+            Button("Import", 'import_', 'tryton-ok', default=True),
+            ])
+    import_ = StateTransition()
+    result = StateView(
+        'party.identifier.import.result',
+        'party_ge_identifier.identifier_import_result_view_form', [
+            Button("Close", 'end', 'tryton-close', default=True),
+            ])
+
+    def transition_import_(self):
+        pool = Pool()
+        Identifier = pool.get('party.identifier')
+        Party = pool.get('party.party')
+
+        data = self.start.data
+        if isinstance(data, bytes):
+            data = data.decode('utf-8-sig')
+        reader = csv.reader(
+            io.StringIO(data), delimiter=self.start.delimiter or ',')
+        lines = [r for r in reader if any(c.strip() for c in r)]
+        offset = 1
+        if self.start.header and lines:
+            lines = lines[1:]
+            offset = 2
+
+        # პარტნიორები კოდით, ერთი ძებნით თითო grouped_slice-ზე
+        codes = {(line[0] if line else '').strip() for line in lines}
+        party_ids = {}
+        for sub_codes in grouped_slice(codes):
+            party_ids.update(
+                (p.code, p.id) for p in Party.search([
+                        ('code', 'in', list(sub_codes)),
+                        ]))
+
+        rows = []
+        for line in lines:
+            line = list(line) + [''] * (3 - len(line))
+            party = line[0].strip()
+            rows.append((
+                    party_ids.get(party, party or None),
+                    line[1].strip(), line[2]))
+        identifiers, report = Identifier.import_rows(rows)
+
+        self.result.created = len(identifiers)
+        self.result.errors = len(report)
+        self.result.report = '\n'.join(
+            f"{r['row'] + offset}: {r['message']}" for r in report)
+        return 'result'
+
+    def default_result(self, fields):
+        return {
+            'created': self.result.created,
+            'errors': self.result.errors,
+            'report': self.result.report,
+            }
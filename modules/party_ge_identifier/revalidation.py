@@ -0,0 +1,217 @@
+"""
+შენახული ge_tax / ge_pn კოდების ხელახალი შემოწმება (cron).
+
+party.identifier იკითხება id-ით დალაგებულ ნაწილებად (keyset: id >
+ბოლო id), შეცდომები იწერება party.identifier.finding-ში, პროგრესი –
+party.identifier.revalidation-ში ყოველი ნაწილის შემდეგ. ამიტომ
+მილიონობით ჩანაწერის შემოწმება რამდენიმე ღამეზე ნაწილდება. წესების
+(checksum.rules_version) შეცვლისას შემოწმება თავიდან იწყება.
+
+    [party_ge_identifier]
+    revalidation_chunk = 10000
+    # ერთი გაშვების მაქსიმალური ხანგრძლივობა (წამი)
+    revalidation_seconds = 3600
+"""
+import datetime as dt
+import time
+
+from sql import Literal
+
+from trytond.config import config
+from trytond.model import ModelSingleton, ModelSQL, ModelView, fields
+from trytond.pool import Pool, PoolMeta
+from trytond.transaction import Transaction
+
+from . import checksum, validation
+
+__all__ = ['Finding', 'Revalidation', 'Cron']
+
+CHUNK = config.getint(
+    'party_ge_identifier', 'revalidation_chunk', default=10000)
+MAX_SECONDS = config.getint(
+    'party_ge_identifier', 'revalidation_seconds', default=3600)
+
+
+class Finding(ModelSQL, ModelView):
+    "Georgian Identifier Finding"
+    __name__ = 'party.identifier.finding'
+
+    identifier = fields.Many2One(
+        'party.identifier', "Identifier", required=True, readonly=True,
+        ondelete='CASCADE')
+    party = fields.Many2One(
+        'party.party', "Party", readonly=True, ondelete='CASCADE')
+    type = fields.Char("Type", readonly=True)
+    code = fields.Char("Code", readonly=True)
+    # გასაღებები – validation.MESSAGES
+    error = fields.Selection([
+            ('tax_digits', "Tax ID Not Digits"),
+            ('tax_mod11', "Tax ID Checksum"),
+            ('tax_length', "Tax ID Length"),
+            ('pn_digits', "Personal Number Not Digits"),
+            ('pn_length', "Personal Number Length"),
+            ('pn_mod11', "Personal Number Checksum"),
+            ('empty', "Empty Code"),
+            ('type', "Not a Georgian Type"),
+            ('party', "Unknown Party"),
+            ('duplicate', "Duplicate"),
+            ], "Error", readonly=True)
+    message = fields.Function(fields.Char("Message"), 'get_message')
+    rules_version = fields.Char("Rules Version", readonly=True)
+
+    @classmethod
+    def __setup__(cls):
+        super().__setup__()
+        cls._order.insert(0, ('identifier', 'ASC'))
+
+    def get_message(self, name):
+        return validation.MESSAGES[self.error].format(
+            code=self.code, type=self.type,
+            party=self.party.rec_name if self.party else '')
+
+
+class Revalidation(ModelSingleton, ModelSQL, ModelView):
+    "Georgian Identifier Re-validation"
+    __name__ = 'party.identifier.revalidation'
+
+    rules_version = fields.Char("Rules Version", readonly=True)
+    last_id = fields.Integer(
+        "Last Identifier", readonly=True,
+        help="The run resumes after this identifier.")
+    checked = fields.Integer("Checked", readonly=True)
+    invalid = fields.Integer("Invalid", readonly=True)
+    done = fields.Boolean("Done", readonly=True)
+    started_at = fields.Timestamp("Started At", readonly=True)
+    finished_at = fields.Timestamp("Finished At", readonly=True)
+
+    @classmethod
+    def __setup__(cls):
+        super().__setup__()
+        cls._buttons.update({
+                'restart': {},
+                })
+
+    @classmethod
+    def default_last_id(cls):
+        return 0
+
+    @classmethod
+    def default_checked(cls):
+        return 0
+
+    @classmethod
+    def default_invalid(cls):
+        return 0
+
+    @classmethod
+    def default_done(cls):
+        return False
+
+    @classmethod
+    @ModelView.button
+    def restart(cls, records):
+        cls._reset(cls._checkpoint(), checksum.rules_version())
+
+    @classmethod
+    def _checkpoint(cls):
+        return cls.get_singleton() or cls.create([{}])[0]
+
+    @classmethod
+    def _reset(cls, checkpoint, version):
+        "წინა შედეგების წაშლა და თავიდან დაწყება"
+        pool = Pool()
+        Finding = pool.get('party.identifier.finding')
+        finding = Finding.__table__()
+        cursor = Transaction().connection.cursor()
+        cursor.execute(*finding.delete())
+        cls.write([checkpoint], {
+                'rules_version': version,
+                'last_id': 0,
+                'checked': 0,
+                'invalid': 0,
+                'done': False,
+                'started_at': dt.datetime.now(),
+                'finished_at': None,
+                })
+
+    @classmethod
+    def run(cls):
+        """
+        Cron: შემდეგი ნაწილები MAX_SECONDS-ის ამოწურვამდე (მინიმუმ ერთი).
+
+        ყოველი ნაწილის შემდეგ ტრანზაქცია commit-დება, ამიტომ შეწყვეტილი
+        გაშვება ბოლო შენახული id-დან გრძელდება.
+        """
+        pool = Pool()
+        Finding = pool.get('party.identifier.finding')
+        Identifier = pool.get('party.identifier')
+        transaction = Transaction()
+
+        checkpoint = cls._checkpoint()
+        version = checksum.rules_version()
+        if checkpoint.rules_version != version:
+            cls._reset(checkpoint, version)
+            checkpoint = cls(checkpoint.id)
+        if checkpoint.done:
+            return
+
+        table = Identifier.__table__()
+        cursor = transaction.connection.cursor()
+        last_id, checked, invalid = (
+            checkpoint.last_id, checkpoint.checked, checkpoint.invalid)
+        start = time.monotonic()
+        done = False
+        while True:
+            cursor.execute(*table.select(
+                    table.id, table.party, table.type, table.code,
+                    where=(table.id > last_id)
+                    & table.type.in_(validation.GE_TYPES)
+                    & (table.active == Literal(True)),
+                    order_by=table.id.asc,
+                    limit=CHUNK))
+            rows = cursor.fetchall()
+            if not rows:
+                done = True
+                break
+
+            _, errors = validation.validate_rows(
+                [(party, type_, code) for _, party, type_, code in rows])
+            if errors:
+                Finding.create([{
+                            'identifier': rows[e.row][0],
+                            'party': e.party,
+                            'type': e.type,
+                            'code': e.code,
+                            'error': e.error,
+                            'rules_version': version,
+                            } for e in errors])
+            last_id = rows[-1][0]
+            checked += len(rows)
+            invalid += len(errors)
+            cls.write([checkpoint], {
+                    'last_id': last_id,
+                    'checked': checked,
+                    'invalid': invalid,
+                    })
+            transaction.commit()
+            if len(rows) < CHUNK:
+                done = True
+                break
+            if time.monotonic() - start >= MAX_SECONDS:
+                break
+        if done:
+            cls.write([checkpoint], {
+                    'done': True,
+                    'finished_at': dt.datetime.now(),
+                    })
+
+
+class Cron(metaclass=PoolMeta):
+    __name__ = 'ir.cron'
+
+    @classmethod
+    def __setup__(cls):
+        super().__setup__()
+        cls.method.selection.append(
+            ('party.identifier.revalidation|run',
+                "Re-validate Georgian Identifiers"))
@@ -0,0 +1,131 @@
+"""
+ქართული იდენტიფიკატორების ვალიდაცია ORM-ის გარეშე.
+
+ერთი ფუნქცია (check) ემსახურება Identifier.check_code-ს და ბევრი
+ჩანაწერის ერთად შემოწმებას (validate_rows), მაგ. RS.ge-დან
+გამოტანილი CSV-ის იმპორტისას.
+"""
+from collections import namedtuple
+
+from . import checksum
+
+GE_TYPES = ('ge_tax', 'ge_pn')
+
+# შეცდომების ტექსტები; {party} მხოლოდ შეცდომისას ივსება
+MESSAGES = {
+    'tax_digits': (
+        'The Georgian Tax ID "{code}" for party "{party}" '
+        'must contain digits only.'),
+    'tax_mod11': (
+        'The Georgian Tax ID "{code}" for party "{party}" '
+        'is 11 digits long but fails the Mod 11 checksum.'),
+    'tax_length': (
+        'The Georgian Tax ID "{code}" for party "{party}" '
+        'must be 9 or 11 digits long.'),
+    'pn_digits': (
+        'The Georgian Personal Number "{code}" for party "{party}" '
+        'must contain digits only.'),
+    'pn_length': (
+        'The Georgian Personal Number "{code}" for party "{party}" '
+        'must be exactly 11 digits long.'),
+    'pn_mod11': (
+        'The Georgian Personal Number "{code}" for party "{party}" '
+        'is not valid (Mod 11 checksum failed).'),
+    'empty': 'The identifier code for party "{party}" is empty.',
+    'type': (
+        'The identifier type "{type}" of "{code}" for party "{party}" '
+        'is not a Georgian type.'),
+    'party': 'The party "{party}" of identifier "{code}" does not exist.',
+    'duplicate': (
+        'The identifier "{code}" for party "{party}" already exists.'),
+    }
+
+# row: შემავალი სტრიქონის ინდექსი; error: MESSAGES-ის გასაღები
+RowError = namedtuple('RowError', ['row', 'party', 'type', 'code', 'error'])
+
+
+def validate_mod11(code, type_='ge_pn'):
+    """
+    Modulus 11 ალგორითმი 11-ნიშნა პირადი ნომრებისთვის (იხ. checksum).
+    """
+    return checksum.is_valid(code, type_)
+
+
+def normalize(code):
+    """
+    საძიებო (ge_code) ფორმა: მხოლოდ ციფრები/ასოები, დიდი ასოებით,
+    'GE' პრეფიქსის გარეშე. ცარიელზე – None.
+    """
+    code = ''.join(ch for ch in (code or '') if ch.isalnum()).upper()
+    if code.startswith('GE') and code[2:].isdigit():
+        code = code[2:]
+    return code or None
+
+
+def check(type_, code, mod11=None):
+    """
+    აბრუნებს შეცდომის გასაღებს (MESSAGES) ან None-ს.
+    mod11 – წინასწარ გამოთვლილი Mod 11 შედეგი (validate_rows).
+
+    ge_tax:
+        - 9 ციფრი  -> მხოლოდ სიგრძე + ციფრები (legacy / modern)
+        - 11 ციფრი -> Mod 11 (ინდ. მეწარმე)
+    ge_pn:
+        - 11 ციფრი -> Mod 11 (ფიზიკური პირი)
+    """
+    if type_ == 'ge_tax':
+        if not code.isdigit():
+            return 'tax_digits'
+        if len(code) == 9:
+            # რეალური ვალიდაცია მაინც RS.ge / NAPR ბაზაში უნდა მოხდეს
+            return None
+        if len(code) == 11:
+            if mod11 is None:
+                mod11 = validate_mod11(code, type_)
+            return None if mod11 else 'tax_mod11'
+        return 'tax_length'
+
+    if type_ == 'ge_pn':
+        if not code.isdigit():
+            return 'pn_digits'
+        if len(code) != 11:
+            return 'pn_length'
+        if mod11 is None:
+            mod11 = validate_mod11(code, type_)
+        if not mod11:
+            return 'pn_mod11'
+    return None
+
+
+def validate_rows(rows):
+    """
+    rows: [(party, type, code), ...]; party – ნებისმიერი (id, კოდი...).
+
+    აბრუნებს (valid, errors): valid – [(row, party, type, code)]
+    გასუფთავებული კოდით, errors – [RowError].
+    """
+    rows = [(p, t, (c or '').strip()) for p, t, c in rows]
+
+    # Mod 11 ყველა 11-ნიშნა კოდზე ერთად, ტიპების მიხედვით
+    mod11 = {}
+    for type_ in GE_TYPES:
+        indexes = [
+            i for i, (_, t, c) in enumerate(rows)
+            if t == type_ and len(c) == checksum.LENGTH]
+        results = checksum.validate_batch(
+            [rows[i][2] for i in indexes], type_)
+        mod11.update(zip(indexes, results))
+
+    valid, errors = [], []
+    for row, (party, type_, code) in enumerate(rows):
+        if type_ not in GE_TYPES:
+            error = 'type'
+        elif not code:
+            error = 'empty'
+        else:
+            error = check(type_, code, mod11.get(row))
+        if error:
+            errors.append(RowError(row, party, type_, code, error))
+        else:
+            valid.append((row, party, type_, code))
+    return valid, errors